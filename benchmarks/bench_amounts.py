@@ -0,0 +1,64 @@
+"""Time the shared amount parser on every table cell and text block of a snapshot
+
+Usage:
+    python benchmarks/bench_amounts.py [--scale N] [--repeat N]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amounts import parse_amount, parse_amounts  # noqa: E402
+from snapshot import SNAPSHOT_PATH, read_snapshot_file  # noqa: E402
+
+
+# Function to collect every string the dashboard parses amounts from
+def snapshot_strings(data):
+    """Return all table cells, paragraphs and list items"""
+    cells = [cell for table in data['tables'] for row in table['rows'] for cell in row]
+    return cells + data['paragraphs'] + data['list_items']
+
+
+# Function to time a parse over all strings
+def best_time(parse, repeat):
+    """Return the best wall time of repeat runs and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=10, help="number of copies of the snapshot strings")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    strings = snapshot_strings(read_snapshot_file(SNAPSHOT_PATH)) * args.scale
+    series = pd.Series(strings)
+
+    scalar_time, scalar = best_time(lambda: [parse_amount(text) for text in strings], args.repeat)
+    batch_time, batch = best_time(lambda: parse_amounts(series), args.repeat)
+
+    # The batch API must agree with the scalar parser on every string
+    identical = all(
+        (amount is None and math.isnan(value)) or (amount is not None and amount.value == value)
+        for amount, value in zip(scalar, batch['value'])
+    )
+
+    print(f"{len(strings)} strings")
+    print(f"  parse_amount per string: {scalar_time * 1000:8.1f} ms")
+    print(f"  parse_amounts on Series: {batch_time * 1000:8.1f} ms")
+    print(f"  identical values:        {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Compare the single-pass lxml extractor with the BeautifulSoup reference parser
+
+Usage:
+    python benchmarks/bench_parse.py                 # page rebuilt from data/scraped_data.json
+    python benchmarks/bench_parse.py page1.html ...  # saved archive pages
+    python benchmarks/bench_parse.py --url URL ...   # pages fetched from the archive
+"""
+import argparse
+import html
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+from snapshot import SNAPSHOT_PATH, read_snapshot_file  # noqa: E402
+
+
+# Function to rebuild an archive-like page from the committed snapshot
+def page_from_snapshot(data):
+    """Render the snapshot back into HTML with navigation, sections, tables and images"""
+    parts = [
+        '<!DOCTYPE html>\n<html lang="nl">\n<head>\n<meta charset="utf-8">\n',
+        f"<title>{html.escape(data['page_title'])}</title>\n",
+        '<script>window.dataLayer = [];</script>\n</head>\n<body>\n<nav>\n<ul>\n'
+    ]
+    parts += [f"<li><a href=\"#\">{html.escape(item)}</a></li>\n" for item in data['list_items']]
+    parts.append('</ul>\n</nav>\n<main>\n')
+
+    paragraphs = data['paragraphs']
+    per_section = max(1, len(paragraphs) // max(1, len(data['headings'])))
+    for i, heading in enumerate(data['headings']):
+        level = heading['level']
+        parts.append(f"<section>\n<h{level}>{html.escape(heading['text'])}</h{level}>\n")
+        for paragraph in paragraphs[i * per_section:(i + 1) * per_section]:
+            parts.append(f"<p>{html.escape(paragraph)}</p>\n")
+        if i < len(data['tables']):
+            table = data['tables'][i]
+            parts.append('<div class="table-wrapper"><table>\n<thead><tr>')
+            parts += [f"<th>{html.escape(header)}</th>" for header in table['headers']]
+            parts.append('</tr></thead>\n<tbody>\n')
+            for row in table['rows']:
+                parts.append('<tr>' + ''.join(f"<td>{html.escape(cell)}</td>" for cell in row) + '</tr>\n')
+            parts.append('</tbody>\n</table></div>\n')
+        parts.append('</section>\n')
+
+    for image in data['images']:
+        parts.append(f"<img src=\"{html.escape(image['src'])}\" alt=\"{html.escape(image['alt'])}\">\n")
+    parts.append('</main>\n<footer><p>Gemeente Rotterdam</p></footer>\n</body>\n</html>\n')
+    return ''.join(parts)
+
+
+# Function to time a parser on a page
+def time_parser(parse, page, repeat):
+    """Return the best wall time of repeat runs and the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(page)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# Function to check that both parsers produce the same snapshot
+def same_output(fast, reference):
+    """Compare all fields; BeautifulSoup lists headings grouped by level instead of in document order"""
+    for key in reference:
+        if key == 'last_updated':
+            continue
+        fast_value = fast[key]
+        if key == 'tables':
+            # The typed columns are only produced by the lxml extractor
+            fast_value = [{'headers': table['headers'], 'rows': table['rows']} for table in fast_value]
+        if key == 'headings':
+            fast_value = sorted(fast_value, key=lambda heading: heading['level'])
+        if fast_value != reference[key]:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="saved HTML pages")
+    parser.add_argument('--url', action='append', default=[], help="page to fetch from the archive")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+    for url in args.url:
+        pages.append((url, scraper.fetch_page(url).text))
+    if not pages:
+        pages.append((SNAPSHOT_PATH, page_from_snapshot(read_snapshot_file(SNAPSHOT_PATH))))
+
+    for name, page in pages:
+        fast_time, fast = time_parser(scraper.parse_page, page, args.repeat)
+        reference_time, reference = time_parser(scraper.parse_page_soup, page, args.repeat)
+        print(f"{name} ({len(page) / 1024:.0f} KB)")
+        print(f"  BeautifulSoup html.parser: {reference_time * 1000:8.1f} ms")
+        print(f"  lxml single pass:          {fast_time * 1000:8.1f} ms")
+        print(f"  speedup:                   {reference_time / fast_time:8.1f}x")
+        print(f"  identical output:          {same_output(fast, reference)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""Time and memory-profile the extraction and rendering pipeline on the snapshot and scaled copies
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scales 1 10 100] [--repeat N] [--output results.json]
+    python benchmarks/bench_pipeline.py --compare baseline.json [--threshold 1.25]
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dashboard  # noqa: E402
+from cache import artifacts, frames  # noqa: E402
+from corpus import Corpus, corpus_path  # noqa: E402
+from snapshot import SNAPSHOT_PATH, Snapshot, read_snapshot_file  # noqa: E402
+from tables import table_columns  # noqa: E402
+from tree_layout import layouts  # noqa: E402
+
+# Function to build a synthetic corpus from copies of the snapshot
+def scale_corpus(data, scale):
+    """Return the snapshot with its paragraphs, list items, tables, headings and numbers repeated scale times
+
+    Headings and table headers of every copy get a numbered suffix, so the
+    heading tree and the table titles grow instead of collapsing into one.
+    """
+    if scale == 1:
+        return data
+    copies = range(1, scale + 1)
+    suffix = lambda text, k: text if k == 1 else f"{text} ({k})"  # noqa: E731
+    return {
+        **data,
+        'headings': [{**heading, 'text': suffix(heading['text'], k)} for k in copies for heading in data['headings']],
+        'paragraphs': data['paragraphs'] * scale,
+        'list_items': data['list_items'] * scale,
+        'tables': [
+            {**table, 'headers': [suffix(header, k) for header in table['headers']]}
+            for k in copies for table in data['tables']
+        ],
+        'numeric_data': data['numeric_data'] * scale,
+        'full_text': '\n'.join([data['full_text']] * scale)
+    }
+
+
+# Helper function to empty the caches so every run builds from scratch
+def clear_caches():
+    artifacts.clear()
+    frames.clear()
+    layouts.clear()
+
+
+# Function to time and trace one stage
+def measure(run, repeat):
+    """Return the best and mean wall time over repeat cold-cache runs and the peak traced memory of one more run
+
+    An untimed run first takes one-off costs such as lazy imports and
+    Plotly's template loading out of the numbers.
+    """
+    clear_caches()
+    run()
+
+    times = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'best_s': min(times), 'mean_s': sum(times) / len(times), 'peak_bytes': peak}
+
+
+# Function to list the benchmarked stages of a corpus
+def pipeline_stages(data):
+    """Return (stage name, function) pairs; inputs of each stage are prepared outside the timed call"""
+    snapshot = Snapshot.from_data(data)
+    corpus = Corpus.from_data(data)
+    metrics = dashboard.process_data(data, corpus)
+    facts = dashboard.FinancialFacts.from_dict(metrics['financial_facts'])
+    columns = table_columns(data['tables'])
+    return [
+        ('process_data', lambda: dashboard.process_data(data, corpus)),
+        ('create_pie_chart_for_table', lambda: [dashboard.create_pie_chart_for_table(table, i) for i, table in enumerate(columns)]),
+        ('create_mindmap', lambda: dashboard.create_mindmap(data['headings'])),
+        ('create_financial_chart', lambda: dashboard.create_financial_chart(facts)),
+        ('create_financial_pie_chart', lambda: dashboard.create_financial_pie_chart(facts)),
+        ('update_dashboard', lambda: dashboard.build_dashboard(snapshot))
+    ]
+
+
+# Helper function to describe the machine and code a run was made on
+def run_metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scales': args.scales
+    }
+
+
+# Function to compare a run with an earlier one
+def compare(results, baseline, threshold):
+    """Print the time and memory ratios per stage and return the stages slower than threshold"""
+    previous = {(item['corpus'], item['stage']): item for item in baseline['results']}
+    regressions = []
+    print(f"{'corpus':>7} {'stage':<28} {'time':>8} {'memory':>8}", file=sys.stderr)
+    for item in results:
+        before = previous.get((item['corpus'], item['stage']))
+        if before is None:
+            continue
+        time_ratio = item['best_s'] / before['best_s'] if before['best_s'] else float('inf')
+        memory_ratio = item['peak_bytes'] / before['peak_bytes'] if before['peak_bytes'] else float('inf')
+        flag = '  <-- slower' if time_ratio > threshold else ''
+        print(f"{item['corpus']:>7} {item['stage']:<28} {time_ratio:7.2f}x {memory_ratio:7.2f}x{flag}", file=sys.stderr)
+        if time_ratio > threshold:
+            regressions.append(item)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="sizes of the corpora, as copies of the snapshot")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare with")
+    parser.add_argument('--threshold', type=float, default=1.25, help="time ratio above which a stage counts as a regression")
+    args = parser.parse_args()
+
+    # Measure the builders, not the shared on-disk cache
+    artifacts.directory = None
+
+    data = read_snapshot_file(SNAPSHOT_PATH)
+
+    # update_dashboard writes a corpus file per scaled snapshot; remove those when done
+    existing_corpora = set(glob.glob(corpus_path('*')))
+    results = []
+    try:
+        for scale in args.scales:
+            corpus = scale_corpus(data, scale)
+            for stage, run in pipeline_stages(corpus):
+                result = {'corpus': f"{scale}x", 'stage': stage, **measure(run, args.repeat)}
+                results.append(result)
+                print(f"{result['corpus']:>5} {stage:<28} {result['best_s'] * 1000:9.1f} ms {result['peak_bytes'] / 1e6:8.1f} MB", file=sys.stderr)
+    finally:
+        for path in set(glob.glob(corpus_path('*'))) - existing_corpora:
+            os.remove(path)
+
+    report = {'meta': run_metadata(args), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
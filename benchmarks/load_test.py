@@ -0,0 +1,247 @@
+"""Replay the dashboard's callback traffic against gunicorn and report latency, throughput and errors
+
+Without --url a local `gunicorn dashboard:server` is started on the committed
+snapshot (with the refresh disabled, so no network is needed) and stopped
+afterwards.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 50] [--duration 30] [--rate 0] [--workers 4]
+    python benchmarks/load_test.py --url http://127.0.0.1:8050/ --rate 200 --poll-share 0.8
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Input every section callback listens to
+SECTIONS_REQUEST = {'id': 'sections-request', 'property': 'data'}
+
+
+# Helper function to find a free local port
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# Function to start gunicorn on the committed snapshot
+def start_server(port, workers, threads):
+    """Start `gunicorn dashboard:server` in the repository and return the process once it answers"""
+    env = dict(os.environ, SCRAPE_TTL=str(10 ** 9))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'dashboard:server', '--bind', f"127.0.0.1:{port}",
+         '--workers', str(workers), '--threads', str(threads), '--log-level', 'warning'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}/"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            if requests.get(url + 'api/version', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start within 60 seconds")
+
+
+# Helper function to turn a callback output string into the outputs field of a request
+def callback_outputs(output):
+    """Return {'id', 'property'} for a single output, or a list of them for a multi-output callback"""
+    if output.startswith('..') and output.endswith('..'):
+        return [callback_outputs(part) for part in output[2:-2].split('...')]
+    component_id, prop = output.rsplit('.', 1)
+    return {'id': component_id, 'property': prop}
+
+
+# Function to build the callback requests a freshly opened tab sends
+def section_requests(session, url):
+    """Return (output, payload) pairs for every server-side callback triggered by sections-request"""
+    dependencies = session.get(url + '_dash-dependencies', timeout=30).json()
+    version = session.get(url + 'api/version', timeout=30).json()['version']
+    payloads = []
+    for dependency in dependencies:
+        if dependency.get('clientside_function') or dependency['inputs'] != [SECTIONS_REQUEST]:
+            continue
+        payloads.append((dependency['output'], {
+            'output': dependency['output'],
+            'outputs': callback_outputs(dependency['output']),
+            'inputs': [dict(SECTIONS_REQUEST, value=version)],
+            'changedPropIds': ['sections-request.data']
+        }))
+    return payloads, version
+
+
+class LoadTest:
+    """Sends requests from a pool of virtual tabs and records every result
+
+    Each tab first loads the page and the layout. With rate 0 the tabs send
+    requests back to back (closed loop); otherwise requests arrive at rate
+    per second (open loop, Poisson arrivals) and latency is measured from
+    the scheduled arrival, so queueing in the client is not hidden.
+    """
+
+    def __init__(self, url, payloads, version, concurrency, poll_share=0.0, seed=42):
+        self.url = url
+        self.payloads = payloads
+        self.version = version
+        self.concurrency = concurrency
+        self.poll_share = poll_share
+        self.random = random.Random(seed)
+        self.next_section = itertools.cycle(range(len(payloads)))
+        self.results = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            # Opening a tab: the page and its layout
+            for path in ('', '_dash-layout'):
+                self._send(session, 'layout', 'GET', self.url + path, time.perf_counter())
+        return session
+
+    def _choose(self):
+        with self._lock:
+            if self.random.random() < self.poll_share:
+                return 'poll', None
+            output, payload = self.payloads[next(self.next_section)]
+            return output, payload
+
+    def _send(self, session, kind, method, url, scheduled, **kwargs):
+        status, size = None, 0
+        try:
+            response = session.request(method, url, timeout=60, **kwargs)
+            status, size = response.status_code, len(response.content)
+        except requests.RequestException:
+            pass
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            self.results.append((kind, latency, status, size))
+
+    def request(self, scheduled=None):
+        """Send one request (a version poll or a section callback)"""
+        scheduled = time.perf_counter() if scheduled is None else scheduled
+        session = self._session()
+        kind, payload = self._choose()
+        if payload is None:
+            self._send(session, kind, 'GET', self.url + 'api/version', scheduled, headers={'If-None-Match': f'"{self.version}"'})
+        else:
+            self._send(session, kind, 'POST', self.url + '_dash-update-component', scheduled, json=payload)
+
+    def run(self, duration, rate=0.0):
+        """Send requests for duration seconds and return the wall time"""
+        start = time.perf_counter()
+        end = start + duration
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            if rate:
+                arrival = start
+                while True:
+                    arrival += self.random.expovariate(rate)
+                    if arrival >= end:
+                        break
+                    time.sleep(max(0.0, arrival - time.perf_counter()))
+                    executor.submit(self.request, arrival)
+            else:
+                def closed_loop():
+                    while time.perf_counter() < end:
+                        self.request()
+                for _ in range(self.concurrency):
+                    executor.submit(closed_loop)
+        return time.perf_counter() - start
+
+
+# Function to summarize the results of a load test
+def summarize(results, wall_time):
+    """Return totals and latency percentiles, overall and per kind of request (layout loads excluded from the total)"""
+    def stats(rows):
+        latencies = np.array([latency for _, latency, _, _ in rows]) * 1000
+        errors = sum(1 for _, _, status, _ in rows if status is None or status >= 400)
+        sizes = [size for _, _, _, size in rows]
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(rows) else (0.0, 0.0, 0.0)
+        return {
+            'requests': len(rows),
+            'throughput_rps': len(rows) / wall_time,
+            'error_rate': errors / len(rows) if rows else 0.0,
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'bytes_total': int(sum(sizes)),
+            'bytes_mean': float(np.mean(sizes)) if sizes else 0.0
+        }
+
+    traffic = [row for row in results if row[0] != 'layout']
+    kinds = sorted({row[0] for row in results})
+    return {
+        'wall_s': wall_time,
+        'total': stats(traffic),
+        'by_kind': {kind: stats([row for row in results if row[0] == kind]) for kind in kinds}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="dashboard to test (default: start a local gunicorn)")
+    parser.add_argument('--workers', type=int, default=4, help="gunicorn workers of the local server")
+    parser.add_argument('--threads', type=int, default=1, help="gunicorn threads per worker of the local server")
+    parser.add_argument('--concurrency', type=int, default=50, help="number of virtual tabs sending requests")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to send requests")
+    parser.add_argument('--rate', type=float, default=0, help="requests per second (0: every tab sends back to back)")
+    parser.add_argument('--warmup', type=float, default=2, help="seconds of traffic sent first and left out of the results, so every worker has built its caches")
+    parser.add_argument('--poll-share', type=float, default=0.0, help="share of requests that are /api/version polls instead of section callbacks")
+    parser.add_argument('--output', help="write the summary as JSON to this file (default: stdout)")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(free_port(), args.workers, args.threads)
+    elif not url.endswith('/'):
+        url += '/'
+
+    try:
+        payloads, version = section_requests(requests.Session(), url)
+        test = LoadTest(url, payloads, version, args.concurrency, args.poll_share)
+        if args.warmup:
+            test.run(args.warmup, args.rate)
+            test.results.clear()
+        wall_time = test.run(args.duration, args.rate)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    summary = summarize(test.results, wall_time)
+    summary['config'] = {key: value for key, value in vars(args).items() if key != 'output'}
+    total = summary['total']
+    print(
+        f"{total['requests']} requests in {wall_time:.1f} s: {total['throughput_rps']:.1f} req/s, "
+        f"p50 {total['p50_ms']:.1f} ms, p95 {total['p95_ms']:.1f} ms, p99 {total['p99_ms']:.1f} ms, "
+        f"errors {total['error_rate']:.2%}, {total['bytes_total'] / 1e6:.1f} MB",
+        file=sys.stderr
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    else:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from plotly.utils import PlotlyJSONEncoder
+
+from snapshot import atomic_write
+from telemetry import ARTIFACT_BYTES, CallbackCounter, registry, span
+
+# Directory for the shared on-disk cache; unset keeps the cache in memory only
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR')
+
+# Maximum number of artifacts kept per backend
+CACHE_SIZE = int(os.environ.get('DASHBOARD_CACHE_SIZE', '64'))
+
+# Trailing index of per-item artifact names such as "table-12"
+ITEM_INDEX = re.compile(r'-\d+$')
+
+
+class ArtifactCache:
+    """LRU cache of derived artifacts keyed by snapshot version and artifact name
+
+    Values are stored as plain JSON (Plotly figures and Dash components are
+    serialized with PlotlyJSONEncoder), so a hit never touches pandas or the
+    figure builders. With a directory configured, artifacts are also written
+    to disk so that gunicorn workers can share them.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, directory=CACHE_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, version, name):
+        return os.path.join(self.directory, f"{version}-{name}.json")
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _read_disk(self, version, name):
+        try:
+            with open(self._path(version, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, version, name, payload):
+        try:
+            atomic_write(self._path(version, name), payload)
+        except OSError:
+            return
+        self._prune_disk()
+
+    def _prune_disk(self):
+        # Evict the least recently written files beyond the size limit
+        try:
+            files = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith('.json')
+            ]
+            files.sort(key=os.path.getmtime, reverse=True)
+            for path in files[self.max_entries:]:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, version, name):
+        """Return a cached artifact, or None if it has not been built for this version"""
+        key = (version, name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.directory:
+            value = self._read_disk(version, name)
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, version, name, value):
+        """Store an artifact and return it in its cached (plain JSON) form"""
+        with span('serialize'):
+            payload = json.dumps(value, cls=PlotlyJSONEncoder)
+        # Per-item artifacts share one label, so the number of series stays fixed
+        ARTIFACT_BYTES.observe(len(payload), ITEM_INDEX.sub('', name))
+        value = json.loads(payload)
+        self._remember((version, name), value)
+        if self.directory:
+            self._write_disk(version, name, payload)
+        return value
+
+    def get_or_build(self, version, name, build):
+        """Return the cached artifact, calling build() to create it on a miss"""
+        value = self.get(version, name)
+        if value is None:
+            value = self.set(version, name, build())
+        return value
+
+    def clear(self):
+        """Remove all in-memory entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+class FrameCache:
+    """LRU cache of live objects (e.g. DataFrames) keyed by snapshot version and name
+
+    Unlike ArtifactCache nothing is serialized, so values stay usable as they
+    are, but they only live in this process.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, version, name, build):
+        """Return the cached value, calling build() to create it on a miss"""
+        key = (version, name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Default caches shared by every request in this process
+artifacts = ArtifactCache()
+frames = FrameCache()
+
+# Hit and miss counts of both caches, read only when the metrics are scraped
+registry.register(CallbackCounter(
+    'voorjaarsnota_cache_lookups_total', "Lookups in the artifact and frame caches", ('cache', 'result'),
+    lambda: {
+        ('artifacts', 'hit'): artifacts.hits,
+        ('artifacts', 'miss'): artifacts.misses,
+        ('frames', 'hit'): frames.hits,
+        ('frames', 'miss'): frames.misses
+    }
+))
@@ -0,0 +1,247 @@
+import codecs
+import glob
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Sequence
+
+import numpy as np
+
+from cache import CACHE_DIR
+from snapshot import SNAPSHOT_PATH, atomic_write, snapshots
+from snapshot_format import LazySnapshotData
+from topics import CHUNK_SIZE
+
+# First bytes of a corpus file
+MAGIC = b'VJNCORP\x01'
+
+# Length of the JSON header that follows the magic bytes
+HEADER_LENGTH = struct.Struct('<I')
+
+# Bytes taken by the magic, the header length and the padded header
+HEADER_SIZE = 1024
+
+# Directory of the corpus files: the shared cache directory if set, so they never end up next to the snapshot
+CORPUS_DIR = CACHE_DIR or tempfile.gettempdir()
+
+# Text fields of a snapshot kept in the corpus; full_text is one string, the others lists of strings
+CORPUS_FIELDS = ('full_text', 'paragraphs', 'list_items')
+
+
+# Helper function to read a text field without keeping it in a lazily decoded snapshot
+def _text_field(data, name):
+    if isinstance(data, LazySnapshotData):
+        return data.peek(name)
+    return data.get(name, '' if name == 'full_text' else [])
+
+
+# Function to encode the text fields of a snapshot as a corpus
+def encode_corpus(data):
+    """Return the corpus bytes: MAGIC, a uint32 header length, a JSON header, int64 offset arrays and the UTF-8 text
+
+    Every field is a run of strings in one shared text blob; its offset array
+    holds the byte position where each string starts plus the end of the
+    last one, so string i is text[offsets[i]:offsets[i + 1]].
+    """
+    texts = []
+    arrays = []
+    position = 0
+    for name in CORPUS_FIELDS:
+        value = _text_field(data, name)
+        strings = [value] if name == 'full_text' else list(value)
+        offsets = [position]
+        for string in strings:
+            encoded = string.encode('utf-8')
+            texts.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+        arrays.append(np.array(offsets, dtype='<i8'))
+
+    # Offset arrays start right after a header padded to HEADER_SIZE bytes, so they are 8-byte aligned
+    fields = {}
+    header_size = HEADER_SIZE - len(MAGIC) - HEADER_LENGTH.size
+    offset = HEADER_SIZE
+    for name, array in zip(CORPUS_FIELDS, arrays):
+        fields[name] = [offset, len(array)]
+        offset += array.nbytes
+    header = json.dumps({'format': 1, 'fields': fields, 'text_offset': offset}).encode('utf-8')
+    if len(header) > header_size:
+        raise ValueError("Corpus header does not fit")
+    header = header.ljust(header_size)
+    return b''.join([MAGIC, HEADER_LENGTH.pack(header_size), header] + [array.tobytes() for array in arrays] + texts)
+
+
+class MappedStrings(Sequence):
+    """Read-only list of the strings of one corpus field, decoded from the buffer on access"""
+
+    def __init__(self, corpus, offsets):
+        self._corpus = corpus
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._corpus.decode(int(self._offsets[index]), int(self._offsets[index + 1]))
+
+
+class Corpus:
+    """Text fields of a snapshot in one buffer, normally a read-only memory map shared by all processes
+
+    Strings are decoded only when asked for and not kept, so a process holds
+    no copy of the text beyond the shared page cache. Substring search runs on
+    the raw UTF-8 bytes and tokenization reads the buffer in chunks.
+    """
+
+    def __init__(self, buffer):
+        # A truncated or foreign file must fail with ValueError, like any other bad corpus
+        if len(buffer) < HEADER_SIZE or bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a corpus file")
+        self.buffer = buffer
+        (header_size,) = HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        start = len(MAGIC) + HEADER_LENGTH.size
+        header = json.loads(bytes(buffer[start:start + header_size]).decode('utf-8'))
+        if header.get('format') != 1:
+            raise ValueError("Not a corpus file")
+        self.text_offset = header['text_offset']
+        self.offsets = {
+            name: np.frombuffer(buffer, dtype='<i8', count=count, offset=offset)
+            for name, (offset, count) in header['fields'].items()
+        }
+
+    @classmethod
+    def open(cls, path):
+        """Map a corpus file read-only"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_data(cls, data):
+        """Build an in-memory corpus (e.g. for the offline sample or benchmarks)"""
+        return cls(encode_corpus(data))
+
+    def decode(self, start, end):
+        """Return the text between two byte offsets of the text blob"""
+        return bytes(self.buffer[self.text_offset + start:self.text_offset + end]).decode('utf-8')
+
+    def strings(self, name):
+        """Return the strings of a field as a lazily decoded sequence"""
+        return MappedStrings(self, self.offsets[name])
+
+    def span(self, name):
+        """Return the (start, end) byte range of a whole field in the text blob"""
+        offsets = self.offsets[name]
+        return int(offsets[0]), int(offsets[-1])
+
+    def chunks(self, name='full_text', size=CHUNK_SIZE):
+        """Yield the text of a field as strings of roughly size bytes, never splitting a UTF-8 character"""
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        start, end = self.span(name)
+        for position in range(start, end, size):
+            chunk = self.buffer[self.text_offset + position:self.text_offset + min(position + size, end)]
+            yield decoder.decode(bytes(chunk))
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+    def find_all(self, needle, name='full_text'):
+        """Return the byte offset within the field of every occurrence of needle, searching the raw buffer"""
+        pattern = needle.encode('utf-8')
+        start, end = self.span(name)
+        start += self.text_offset
+        end += self.text_offset
+        positions = []
+        if not pattern:
+            return positions
+        position = self.buffer.find(pattern, start, end)
+        while position != -1:
+            positions.append(position - start)
+            position = self.buffer.find(pattern, position + 1, end)
+        return positions
+
+    def find(self, needle, name='full_text', start=0):
+        """Return the byte offset within the field of the first occurrence of needle at or after start, or -1"""
+        field_start, field_end = self.span(name)
+        position = self.buffer.find(needle.encode('utf-8'), self.text_offset + field_start + start, self.text_offset + field_end)
+        return position - self.text_offset - field_start if position != -1 else -1
+
+    def string_index(self, name, byte_offset):
+        """Return the index of the string of a field that contains a byte offset found by find_all()"""
+        offsets = self.offsets[name]
+        return int(np.searchsorted(offsets, offsets[0] + byte_offset, side='right')) - 1
+
+
+# Helper function to name the corpus file of a snapshot version
+def corpus_path(version, snapshot_path=SNAPSHOT_PATH, directory=CORPUS_DIR):
+    base = os.path.splitext(os.path.basename(snapshot_path))[0]
+    return os.path.join(directory, f"{base}.{version}.corpus")
+
+
+# Helper function to tell whether a snapshot is the one currently in its file
+def _is_on_disk(snapshot, snapshot_path):
+    try:
+        stat = os.stat(snapshot_path)
+    except OSError:
+        return False
+    return snapshot.mtime_ns == stat.st_mtime_ns and snapshot.size == stat.st_size
+
+
+# Function to remove the corpus files of earlier snapshots
+def remove_old_corpora(path, snapshot_path=SNAPSHOT_PATH, directory=CORPUS_DIR):
+    """Remove the corpus files of snapshot_path written before the one at path"""
+    newest = os.stat(path).st_mtime_ns
+    for old_path in glob.glob(corpus_path('*', snapshot_path, directory)):
+        try:
+            if old_path != path and os.stat(old_path).st_mtime_ns < newest:
+                os.remove(old_path)
+        except OSError:
+            # Removed by another process in the meantime
+            continue
+
+
+# Open corpora by snapshot version
+_corpora = {}
+_corpora_lock = threading.Lock()
+
+
+# Function to get the shared corpus of a snapshot
+def open_corpus(snapshot, snapshot_path=SNAPSHOT_PATH, directory=CORPUS_DIR):
+    """Return the Corpus of a snapshot, mapping its file in directory and writing it first if no process has yet
+
+    When a process writes the corpus of the snapshot that is currently on
+    disk, it removes the older corpus files; processes that still map them
+    keep their copy until they move on. A process still serving an older
+    snapshot never removes anything, so it cannot delete the corpus of a
+    newer one. Without a writable directory, or with a damaged file, the
+    corpus is built in memory. Once the corpus is open, the current snapshot
+    of the process drops its own copy of the text fields.
+    """
+    with _corpora_lock:
+        corpus = _corpora.get(snapshot.version)
+        if corpus is None:
+            path = corpus_path(snapshot.version, snapshot_path, directory)
+            try:
+                if not os.path.exists(path):
+                    atomic_write(path, encode_corpus(snapshot.data))
+                    if _is_on_disk(snapshot, snapshot_path):
+                        remove_old_corpora(path, snapshot_path, directory)
+                corpus = Corpus.open(path)
+            except (OSError, ValueError):
+                corpus = Corpus.from_data(snapshot.data)
+
+            # Only the corpus of the current snapshot is kept open
+            _corpora.clear()
+            _corpora[snapshot.version] = corpus
+
+    # Every reader of the text goes through the corpus; a JSON snapshot would otherwise keep the strings in each worker
+    snapshots.drop_fields(snapshot, CORPUS_FIELDS)
+    return corpus
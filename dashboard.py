@@ -1,326 +1,212 @@
 import dash
+import flask
 from dash import dcc, html, dash_table
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 import re
 import datetime
-import requests
-from bs4 import BeautifulSoup
-import networkx as nx
+import itertools
 import json
 import os
+import threading
+import time
+from amounts import AMOUNT_FLAGS, AMOUNT_REGEX, amount_from_match, match_amount
+from cache import artifacts, frames
+from corpus import Corpus, open_corpus
+from facts import FactBuilder, FinancialFacts
+from scraper import URL, refresher
+from search import SEARCH_LIMIT, build_search_index, highlight
+from snapshot import SNAPSHOT_PATH, Snapshot, snapshots
+from table_query import PAGE_SIZE, TableFrame, query_page
+from tables import table_columns
+from telemetry import CONTENT_TYPE, PAYLOAD_BYTES, REQUEST_SECONDS, output_label, registry, timed
+from topics import top_topics as find_top_topics
+from tree_layout import MINDMAP_LAYOUT, tree_positions
 
-# URL to scrape
-URL = "https://abx10.archiefweb.eu:8443/watdoetdegemeentevoorjaarsnota2024/20241114091054mp_/https://archieven.watdoetdegemeente.rotterdam.nl/voorjaarsnota2024/hoofdlijnen/01-voortgang/"
+# Build every cached output at import (set by gunicorn.conf.py), so no user waits for the first render
+DASHBOARD_WARMUP = os.environ.get('DASHBOARD_WARMUP', '0') == '1'
 
-# Function to scrape data from the website
-def scrape_data():
+# Number of mindmap nodes above which the mindmap is drawn with WebGL
+MINDMAP_WEBGL_NODES = int(os.environ.get('MINDMAP_WEBGL_NODES', '500'))
+
+# Offline sample snapshot, built once so its version stays stable
+_sample_snapshot = None
+
+# Function to get the current snapshot, scraping the website if nothing is cached
+def load_snapshot():
+    """Return the current Snapshot; the file is only read again when it changes on disk"""
+    global _sample_snapshot
     try:
-        # Check if we have cached data and it's recent (less than 1 hour old)
-        if os.path.exists('data/scraped_data.json'):
-            with open('data/scraped_data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Use the cached data
-                print("Using cached data")
-                return data
-        
-        # If no cached data or it's old, scrape new data
-        # Send a request to the URL
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36'
-        }
-        response = requests.get(URL, headers=headers)
-        response.raise_for_status()
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract page title
-        page_title = soup.title.text if soup.title else "Voorjaarsnota 2024 Dashboard"
-        
-        # Extract headings
-        headings = []
-        for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            for heading in soup.find_all(tag):
-                headings.append({
-                    'level': int(tag[1]),
-                    'text': heading.text.strip()
-                })
-        
-        # Extract paragraphs
-        paragraphs = [p.text.strip() for p in soup.find_all('p') if p.text.strip()]
-        
-        # Extract list items
-        list_items = [li.text.strip() for li in soup.find_all('li') if li.text.strip()]
-        
-        # Extract tables
-        tables = []
-        for table in soup.find_all('table'):
-            headers = [th.text.strip() for th in table.find_all('th')]
-            rows = []
-            for tr in table.find_all('tr'):
-                row = [td.text.strip() for td in tr.find_all('td')]
-                if row:
-                    rows.append(row)
-            tables.append({'headers': headers, 'rows': rows})
-        
-        # Extract numeric data (percentages, amounts, etc.)
-        text = soup.get_text()
-        numeric_data = re.findall(r'\d+[.,]?\d*\s?(%|miljoen|duizend|euro|€)', text)
+        # Serve the cached data right away, even when it is stale
+        snapshot = snapshots.get()
+        if snapshot is not None:
+            # Older than the TTL: revalidate it in the background
+            if refresher.is_stale():
+                refresher.refresh_in_background()
+            return snapshot
         
-        # Extract images
-        images = []
-        for img in soup.find_all('img'):
-            images.append({
-                'src': img.get('src', ''),
-                'alt': img.get('alt', ''),
-                'width': img.get('width', ''),
-                'height': img.get('height', '')
-            })
-        
-        # Create structured data
-        data = {
-            'page_title': page_title,
-            'headings': headings,
-            'paragraphs': paragraphs,
-            'list_items': list_items,
-            'tables': tables,
-            'numeric_data': numeric_data,
-            'images': images,
-            'full_text': text,
-            'last_updated': datetime.datetime.now().isoformat()
-        }
-        
-        # Save data to file
-        os.makedirs('data', exist_ok=True)
-        with open('data/scraped_data.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            
-        return data
+        # If no cached data, we have to wait for the first scrape
+        refresher.refresh()
+        return snapshots.get()
     except Exception as e:
         print(f"Error scraping data: {e}")
         
         # If scraping fails, try to load from file
-        if os.path.exists('data/scraped_data.json'):
-            with open('data/scraped_data.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+        snapshot = snapshots.get()
+        if snapshot is not None:
+            return snapshot
         
         # If no file exists, return sample data
-        return {
-            'page_title': "Voorjaarsnota 2024 Dashboard",
-            'headings': [
-                {'level': 1, 'text': 'Voorjaarsnota 2024'},
-                {'level': 2, 'text': 'Voortgang'},
-                {'level': 2, 'text': 'Financiële Ontwikkelingen'},
-                {'level': 2, 'text': 'Beleidsprioriteiten'},
-                {'level': 3, 'text': 'Wonen'},
-                {'level': 3, 'text': 'Mobiliteit'},
-                {'level': 3, 'text': 'Duurzaamheid'},
-                {'level': 3, 'text': 'Economie'},
-                {'level': 3, 'text': 'Sociaal Domein'},
-            ],
-            'paragraphs': [
-                "De Voorjaarsnota 2024 geeft inzicht in de voortgang van de uitvoering van het collegeprogramma en de financiële ontwikkelingen.",
-                "Rotterdam investeert in 2024 fors in de stad met een focus op wonen, mobiliteit en duurzaamheid.",
-                "De gemeente Rotterdam zet in op het bouwen van 3.000 nieuwe woningen in 2024.",
-                "Voor het verbeteren van de mobiliteit is €45 miljoen beschikbaar gesteld.",
-                "De duurzaamheidstransitie wordt versneld met een investering van €30 miljoen.",
-                "De economische ontwikkeling wordt gestimuleerd met €20 miljoen voor innovatie en ondernemerschap.",
-                "In het sociaal domein wordt €60 miljoen geïnvesteerd om armoede tegen te gaan en kansengelijkheid te bevorderen."
-            ],
-            'list_items': [
-                "Bouw van 3.000 nieuwe woningen",
-                "Verbetering van OV-verbindingen",
-                "Verduurzaming van 5.000 woningen",
-                "Ondersteuning van 500 startups en scale-ups",
-                "Uitbreiding van armoedebestrijdingsprogramma's",
-                "Vergroening van 10 wijken",
-                "Aanleg van 15 km nieuwe fietspaden"
-            ],
-            'tables': [
-                {
-                    'headers': ['Programma', 'Budget 2024 (miljoen €)', 'Verschil t.o.v. 2023 (miljoen €)'],
-                    'rows': [
-                        ['Wonen', '150', '+25'],
-                        ['Mobiliteit', '120', '+45'],
-                        ['Duurzaamheid', '80', '+30'],
-                        ['Economie', '70', '+20'],
-                        ['Sociaal Domein', '200', '+60'],
-                        ['Veiligheid', '90', '+15'],
-                        ['Cultuur', '40', '+5']
-                    ]
-                },
-                {
-                    'headers': ['Wijk', 'Aantal nieuwe woningen', 'Investering (miljoen €)'],
-                    'rows': [
-                        ['Centrum', '800', '40'],
-                        ['Noord', '600', '30'],
-                        ['Zuid', '700', '35'],
-                        ['West', '500', '25'],
-                        ['Oost', '400', '20']
-                    ]
-                }
-            ],
-            'numeric_data': [
-                '3.000 woningen', 
-                '€45 miljoen', 
-                '€30 miljoen', 
-                '€20 miljoen', 
-                '€60 miljoen',
-                '5.000 woningen',
-                '500 startups',
-                '10 wijken',
-                '15 km',
-                '150 miljoen €',
-                '120 miljoen €',
-                '80 miljoen €',
-                '70 miljoen €',
-                '200 miljoen €',
-                '90 miljoen €',
-                '40 miljoen €',
-                '800 woningen',
-                '600 woningen',
-                '700 woningen',
-                '500 woningen',
-                '400 woningen'
-            ],
-            'images': [],
-            'full_text': "Voorjaarsnota 2024 Rotterdam - Voortgang en Financiële Ontwikkelingen",
-            'last_updated': datetime.datetime.now().isoformat()
-        }
+        if _sample_snapshot is None:
+            _sample_snapshot = Snapshot.from_data(_sample_data())
+        return _sample_snapshot
+
+# Function to scrape data from the website
+@timed()
+def scrape_data():
+    """Return the snapshot data as a read-only mapping"""
+    return load_snapshot().data
+
+# Sample data used when the website cannot be reached and nothing is cached
+def _sample_data():
+    return {
+        'page_title': "Voorjaarsnota 2024 Dashboard",
+        'headings': [
+            {'level': 1, 'text': 'Voorjaarsnota 2024'},
+            {'level': 2, 'text': 'Voortgang'},
+            {'level': 2, 'text': 'Financiële Ontwikkelingen'},
+            {'level': 2, 'text': 'Beleidsprioriteiten'},
+            {'level': 3, 'text': 'Wonen'},
+            {'level': 3, 'text': 'Mobiliteit'},
+            {'level': 3, 'text': 'Duurzaamheid'},
+            {'level': 3, 'text': 'Economie'},
+            {'level': 3, 'text': 'Sociaal Domein'},
+        ],
+        'paragraphs': [
+            "De Voorjaarsnota 2024 geeft inzicht in de voortgang van de uitvoering van het collegeprogramma en de financiële ontwikkelingen.",
+            "Rotterdam investeert in 2024 fors in de stad met een focus op wonen, mobiliteit en duurzaamheid.",
+            "De gemeente Rotterdam zet in op het bouwen van 3.000 nieuwe woningen in 2024.",
+            "Voor het verbeteren van de mobiliteit is €45 miljoen beschikbaar gesteld.",
+            "De duurzaamheidstransitie wordt versneld met een investering van €30 miljoen.",
+            "De economische ontwikkeling wordt gestimuleerd met €20 miljoen voor innovatie en ondernemerschap.",
+            "In het sociaal domein wordt €60 miljoen geïnvesteerd om armoede tegen te gaan en kansengelijkheid te bevorderen."
+        ],
+        'list_items': [
+            "Bouw van 3.000 nieuwe woningen",
+            "Verbetering van OV-verbindingen",
+            "Verduurzaming van 5.000 woningen",
+            "Ondersteuning van 500 startups en scale-ups",
+            "Uitbreiding van armoedebestrijdingsprogramma's",
+            "Vergroening van 10 wijken",
+            "Aanleg van 15 km nieuwe fietspaden"
+        ],
+        'tables': [
+            {
+                'headers': ['Programma', 'Budget 2024 (miljoen €)', 'Verschil t.o.v. 2023 (miljoen €)'],
+                'rows': [
+                    ['Wonen', '150', '+25'],
+                    ['Mobiliteit', '120', '+45'],
+                    ['Duurzaamheid', '80', '+30'],
+                    ['Economie', '70', '+20'],
+                    ['Sociaal Domein', '200', '+60'],
+                    ['Veiligheid', '90', '+15'],
+                    ['Cultuur', '40', '+5']
+                ]
+            },
+            {
+                'headers': ['Wijk', 'Aantal nieuwe woningen', 'Investering (miljoen €)'],
+                'rows': [
+                    ['Centrum', '800', '40'],
+                    ['Noord', '600', '30'],
+                    ['Zuid', '700', '35'],
+                    ['West', '500', '25'],
+                    ['Oost', '400', '20']
+                ]
+            }
+        ],
+        'numeric_data': [
+            '3.000 woningen', 
+            '€45 miljoen', 
+            '€30 miljoen', 
+            '€20 miljoen', 
+            '€60 miljoen',
+            '5.000 woningen',
+            '500 startups',
+            '10 wijken',
+            '15 km',
+            '150 miljoen €',
+            '120 miljoen €',
+            '80 miljoen €',
+            '70 miljoen €',
+            '200 miljoen €',
+            '90 miljoen €',
+            '40 miljoen €',
+            '800 woningen',
+            '600 woningen',
+            '700 woningen',
+            '500 woningen',
+            '400 woningen'
+        ],
+        'images': [],
+        'full_text': "Voorjaarsnota 2024 Rotterdam - Voortgang en Financiële Ontwikkelingen",
+        'last_updated': datetime.datetime.now().isoformat()
+    }
+
+# Amounts in running text followed by what they are spent on, e.g. "€45 miljoen voor onderwijs"
+FINANCIAL_TEXT_PATTERN = re.compile(AMOUNT_REGEX + r"\s*(?:voor|aan|in|op)\b\s*(?P<category>[^,.]+)", AMOUNT_FLAGS)
 
 # Function to process data for dashboard
-def process_data(data):
-    # Extract financial data
-    financial_data = []
+@timed()
+def process_data(data, corpus=None):
+    # Text fields come from the (memory-mapped) corpus; strings are decoded one at a time and not kept
+    if corpus is None:
+        corpus = Corpus.from_data(data)
+    
+    # Extract financial data into a columnar store
+    financial_facts = FactBuilder()
     
     # First try to extract from tables that look like financial tables
-    for table in data['tables']:
-        if table['headers'] and table['rows']:
+    for columns in table_columns(data['tables']):
+        if columns and columns[0]['values']:
             # Look for headers that might indicate financial data
-            financial_headers = [h for h in table['headers'] if any(term in h.lower() for term in ['budget', 'bedrag', 'miljoen', 'euro', '€', 'kosten', 'investering'])]
+            financial_columns = [c for c in columns if any(term in c['name'].lower() for term in ['budget', 'bedrag', 'miljoen', 'euro', '€', 'kosten', 'investering'])]
             
-            if financial_headers:
-                # Find the index of the financial column
-                financial_col_idx = table['headers'].index(financial_headers[0])
-                category_col_idx = 0  # Assume first column is category
+            if financial_columns:
+                financial_column = financial_columns[0]
+                category_column = columns[0]  # Assume first column is category
                 
-                # Extract financial data from this table
-                for row in table['rows']:
-                    if len(row) > financial_col_idx and len(row) > category_col_idx:
-                        category = row[category_col_idx]
-                        value_str = row[financial_col_idx]
-                        
-                        # Try to extract numeric value
-                        try:
-                            # Handle different formats (e.g., "€ 10 miljoen", "10,5 miljoen €")
-                            value_str = value_str.replace('.', '').replace(',', '.')
-                            
-                            # Extract the numeric part
-                            match = re.search(r'([-+]?\d+(?:\.\d+)?)', value_str)
-                            if match:
-                                value = float(match.group(1))
-                                
-                                # Apply multiplier based on units
-                                if 'miljoen' in value_str.lower() or 'mln' in value_str.lower():
-                                    value *= 1000000
-                                elif 'duizend' in value_str.lower() or 'k' in value_str.lower():
-                                    value *= 1000
-                                
-                                financial_data.append({
-                                    'category': category,
-                                    'amount': value,
-                                    'original_text': row[financial_col_idx],
-                                    'source': 'table'
-                                })
-                        except (ValueError, AttributeError):
-                            pass
+                # Extract financial data from this table; amounts were parsed at ingest
+                for category, amount, text in zip(category_column['values'], financial_column['amounts'], financial_column['values']):
+                    if amount is not None:
+                        financial_facts.append(category, amount, text, 'table')
     
     # Also extract from paragraphs and list items
-    all_text = data['paragraphs'] + data['list_items']
+    all_text = itertools.chain(corpus.strings('paragraphs'), corpus.strings('list_items'))
     for text in all_text:
         # Look for patterns like "€X miljoen voor Y" or "X miljoen euro voor Y"
-        matches = re.finditer(r'(?:€\s*)?(\d+(?:[.,]\d+)?)\s*(miljoen|mln|duizend|k)?\s*(?:euro|€)?\s*(?:voor|aan|in|op)\s*([^,.]+)', text, re.IGNORECASE)
-        for match in matches:
-            try:
-                value_str = match.group(1).replace(',', '.')
-                value = float(value_str)
-                
-                # Apply multiplier
-                if match.group(2):
-                    if 'miljoen' in match.group(2).lower() or 'mln' in match.group(2).lower():
-                        value *= 1000000
-                    elif 'duizend' in match.group(2).lower() or 'k' in match.group(2).lower():
-                        value *= 1000
-                
-                category = match.group(3).strip()
-                
-                financial_data.append({
-                    'category': category,
-                    'amount': value,
-                    'original_text': match.group(0),
-                    'source': 'text'
-                })
-            except (ValueError, AttributeError):
-                pass
+        for match in FINANCIAL_TEXT_PATTERN.finditer(text):
+            financial_facts.append(match.group('category').strip(), amount_from_match(match).value, match.group(0), 'text')
     
     # Also look for specific patterns in numeric_data
     for item in data['numeric_data']:
-        match = re.match(r'(?:€\s*)?(\d+(?:[.,]\d+)?)\s*(miljoen|mln|duizend|k)?\s*(?:euro|€)?\s*', item, re.IGNORECASE)
-        if match:
-            try:
-                value_str = match.group(1).replace(',', '.')
-                value = float(value_str)
-                
-                # Apply multiplier
-                if match.group(2):
-                    if 'miljoen' in match.group(2).lower() or 'mln' in match.group(2).lower():
-                        value *= 1000000
-                    elif 'duizend' in match.group(2).lower() or 'k' in match.group(2).lower():
-                        value *= 1000
-                
-                # Try to find a category from context
-                category = "Overig"  # Default
-                
-                financial_data.append({
-                    'category': category,
-                    'amount': value,
-                    'original_text': item,
-                    'source': 'numeric_data'
-                })
-            except (ValueError, AttributeError):
-                pass
-    
-    # Extract topics (words that appear frequently)
-    text = data['full_text'].lower()
-    
-    # List of common Dutch stopwords to filter out
-    stopwords = ['de', 'het', 'een', 'en', 'van', 'in', 'op', 'voor', 'met', 'door', 'aan', 'is', 'zijn', 'worden', 'werd']
-    
-    # Extract words and filter
-    words = re.findall(r'\b[a-zA-Z]{4,}\b', text)
-    words = [word for word in words if word not in stopwords]
-    
-    # Count occurrences
-    word_counts = {}
-    for word in words:
-        if word in word_counts:
-            word_counts[word] += 1
-        else:
-            word_counts[word] = 1
+        amount = match_amount(item)
+        if amount:
+            # No context to take a category from
+            financial_facts.append("Overig", amount.value, item, 'numeric_data')
     
-    # Get top topics
-    top_topics = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Extract topics (words that appear frequently) in one streaming pass
+    top_topics = find_top_topics(corpus.chunks('full_text'))
     
     # Calculate statistics
     total_sections = len(data['headings'])
-    total_paragraphs = len(data['paragraphs'])
-    total_list_items = len(data['list_items'])
+    total_paragraphs = len(corpus.strings('paragraphs'))
+    total_list_items = len(corpus.strings('list_items'))
     total_tables = len(data['tables'])
     
     return {
-        'financial_data': financial_data,
+        'financial_facts': financial_facts.build().to_dict(),
         'top_topics': top_topics,
         'total_sections': total_sections,
         'total_paragraphs': total_paragraphs,
@@ -329,118 +215,53 @@ def process_data(data):
         'last_updated': data.get('last_updated', datetime.datetime.now().isoformat())
     }
 
+# Helper function to format an amount for hover labels
+def format_hover_amount(value):
+    if value >= 1000000:
+        return f"€ {value/1000000:.1f} miljoen"
+    elif value >= 1000:
+        return f"€ {value/1000:.1f} duizend"
+    return f"€ {value:,.0f}"
+
 # Helper function to create pie charts from table data
-def create_pie_chart_for_table(df, table_index):
-    """Create an enhanced pie chart for a table with better visualization and organization"""
-    # Find numeric columns
-    numeric_cols = []
-    for col in df.columns:
-        # Check if column contains numeric values or values with currency/unit indicators
-        numeric_values = 0
-        for val in df[col]:
-            if val and isinstance(val, str):
-                # Check for numeric values with or without currency symbols and units
-                match = re.search(r'(?:€?\s*)?([-+]?\d[\d.,]*\s*(?:miljoen|mln|k|duizend)?)', val)
-                if match:
-                    numeric_values += 1
-        
-        # If more than 30% of values are numeric, consider it a numeric column
-        if numeric_values > len(df) * 0.3:
-            numeric_cols.append(col)
+@timed()
+def create_pie_chart_for_table(columns, table_index):
+    """Create an enhanced pie chart for the typed columns of a table with better visualization and organization"""
+    # Columns were typed at ingest: numeric when more than 30% of values are amounts (with or without currency symbols and units)
+    numeric_cols = np.array([column['type'] == 'numeric' for column in columns], dtype=bool)
     
     # If we have numeric columns, create pie charts
-    if numeric_cols:
-        # Choose the best column for visualization (the one with most non-zero values)
-        best_col = None
-        max_non_zero = 0
+    if numeric_cols.any():
+        # Rows x columns array of the parsed amounts, NaN where a cell has none
+        amounts = np.array([column['amounts'] for column in columns], dtype=float).T
+        parsed = ~np.isnan(amounts)
         
-        for col in numeric_cols:
-            non_zero_count = 0
-            for val in df[col]:
-                if val and isinstance(val, str):
-                    # Extract numeric value
-                    match = re.search(r'(?:€?\s*)?([-+]?\d[\d.,]*\s*(?:miljoen|mln|k|duizend)?)', val)
-                    if match and match.group(1):
-                        # Clean and convert the value
-                        num_str = match.group(1).replace('.', '').replace(',', '.')
-                        
-                        # Handle units (miljoen, duizend, etc.)
-                        multiplier = 1
-                        if 'miljoen' in num_str or 'mln' in num_str:
-                            multiplier = 1000000
-                            num_str = re.sub(r'\s*(?:miljoen|mln).*', '', num_str)
-                        elif 'duizend' in num_str or 'k' in num_str:
-                            multiplier = 1000
-                            num_str = re.sub(r'\s*(?:duizend|k).*', '', num_str)
-                        
-                        try:
-                            value = float(num_str) * multiplier
-                            if value != 0:
-                                non_zero_count += 1
-                        except ValueError:
-                            pass
-            
-            if non_zero_count > max_non_zero:
-                max_non_zero = non_zero_count
-                best_col = col
+        # Choose the best column for visualization (the first one with most non-zero values)
+        non_zero_counts = np.where(numeric_cols, (parsed & (amounts != 0)).sum(axis=0), 0)
+        best_idx = int(np.argmax(non_zero_counts))
         
-        if best_col:
-            # Extract label column (usually the first non-numeric column)
-            label_col = None
-            for col in df.columns:
-                if col not in numeric_cols:
-                    label_col = col
-                    break
+        if non_zero_counts[best_idx] > 0:
+            best_col = columns[best_idx]['name']
             
+            # Extract label column (usually the first non-numeric column)
             # If no suitable label column found, use the row index
-            if not label_col:
-                df['row_index'] = [f"Rij {i+1}" for i in range(len(df))]
-                label_col = 'row_index'
+            if numeric_cols.all():
+                label_values = pd.Series([f"Rij {i+1}" for i in range(len(amounts))])
+            else:
+                label_values = pd.Series(columns[int(np.argmin(numeric_cols))]['values'], dtype=object)
             
-            # Prepare data for pie chart
-            labels = []
-            values = []
-            hover_text = []
+            # Skip rows with empty or numeric-only labels
+            numeric_label = label_values.apply(isinstance, args=(str,)) & label_values.astype(str).str.strip().str.match(r'^[-+]?\d+(\.\d+)?$')
+            keep = (label_values.astype(bool) & ~numeric_label).to_numpy()
             
-            for i, row in df.iterrows():
-                label = row[label_col]
-                
-                # Skip rows with empty or numeric-only labels
-                if not label or (isinstance(label, str) and re.match(r'^[-+]?\d+(\.\d+)?$', label.strip())):
-                    continue
-                
-                # Extract and convert the value
-                val = row[best_col]
-                if val and isinstance(val, str):
-                    match = re.search(r'(?:€?\s*)?([-+]?\d[\d.,]*\s*(?:miljoen|mln|k|duizend)?)', val)
-                    if match and match.group(1):
-                        # Clean and convert the value
-                        num_str = match.group(1).replace('.', '').replace(',', '.')
-                        
-                        # Handle units (miljoen, duizend, etc.)
-                        multiplier = 1
-                        if 'miljoen' in num_str or 'mln' in num_str:
-                            multiplier = 1000000
-                            num_str = re.sub(r'\s*(?:miljoen|mln).*', '', num_str)
-                        elif 'duizend' in num_str or 'k' in num_str:
-                            multiplier = 1000
-                            num_str = re.sub(r'\s*(?:duizend|k).*', '', num_str)
-                        
-                        try:
-                            value = float(num_str) * multiplier
-                            if value != 0:  # Skip zero values
-                                labels.append(label)
-                                values.append(value)
-                                
-                                # Format hover text
-                                if value >= 1000000:
-                                    hover_text.append(f"€ {value/1000000:.1f} miljoen")
-                                elif value >= 1000:
-                                    hover_text.append(f"€ {value/1000:.1f} duizend")
-                                else:
-                                    hover_text.append(f"€ {value:,.0f}")
-                        except ValueError:
-                            pass
+            # Slices show the size of an amount, so negative amounts count by magnitude; skip zero values
+            slice_values = np.abs(np.nan_to_num(amounts[:, best_idx]))
+            keep &= slice_values != 0
+            
+            # Prepare data for pie chart
+            labels = label_values[keep].tolist()
+            values = slice_values[keep].tolist()
+            hover_text = [format_hover_amount(value) for value in values]
             
             if labels and values:
                 # Sort by value and limit to top categories
@@ -507,59 +328,86 @@ def create_pie_chart_for_table(df, table_index):
             html.P("Geen numerieke kolommen gevonden")
         ])
 
-# Helper function to create a mindmap for the headings
-def create_mindmap(headings):
-    """Create a simplified mindmap visualization for the document headings"""
-    # Create a graph
-    G = nx.Graph()
-    
-    # Add nodes and edges
+# Root node of the mindmap
+MINDMAP_ROOT = "Voorjaarsnota 2024"
+
+# Deepest heading level the mindmap shows before nodes are expanded
+MINDMAP_MAX_LEVEL = 2
+
+# Function to build the full heading tree for the mindmap
+def heading_tree(headings):
+    """Return the mindmap tree of all headings: nodes with label and level, and the parent of every node in heading order"""
+    nodes = {MINDMAP_ROOT: {'label': MINDMAP_ROOT, 'level': 0}}
+    parents = {}
     parent_map = {}
     
-    # Add root node
-    root_id = "Voorjaarsnota 2024"
-    G.add_node(root_id)
-    
-    # Track node levels for styling
-    node_levels = {root_id: 0}
-    
-    # Process headings to create a hierarchical structure
-    # Only include levels 1 and 2 for simplicity
     for i, heading in enumerate(headings):
         # Clean the heading text
         text = heading['text'].strip()
-        if not text or heading['level'] > 2:  # Skip empty headings and levels > 2
+        if not text:  # Skip empty headings
             continue
         
         # Create a unique ID for this heading
         node_id = f"{i}_{text[:30]}"
+        level = heading['level']
+        nodes[node_id] = {'label': text, 'level': level}
         
-        # Add the node to the graph
-        G.add_node(node_id, label=text, level=heading['level'])
-        node_levels[node_id] = heading['level']
+        # Connect to the closest heading of a lower level, or to the root
+        parent_level = level - 1
+        while parent_level > 0 and parent_level not in parent_map:
+            parent_level -= 1
+        parents[node_id] = parent_map.get(parent_level, MINDMAP_ROOT)
         
-        # Connect to parent
-        if heading['level'] == 1:
-            # Level 1 headings connect to root
-            G.add_edge(root_id, node_id)
-            parent_map[heading['level']] = node_id
+        # Update parent map; deeper headings of the previous section can no longer be parents
+        parent_map = {l: node for l, node in parent_map.items() if l < level}
+        parent_map[level] = node_id
+    
+    return {'nodes': nodes, 'parents': parents}
+
+# Helper function to create a mindmap for the headings
+@timed()
+def create_mindmap(headings, layout=MINDMAP_LAYOUT, max_level=MINDMAP_MAX_LEVEL):
+    """Create an interactive mindmap showing headings up to max_level; clicking a node loads its deeper headings"""
+    return html.Div([
+        dcc.Graph(
+            id={'type': 'mindmap-graph', 'index': 'headings'},
+            figure=create_mindmap_figure(heading_tree(headings), layout=layout, max_level=max_level),
+            config={'displayModeBar': False}
+        ),
+        # Nodes the user expanded beyond max_level
+        dcc.Store(id={'type': 'mindmap-expanded', 'index': 'headings'}, data=[]),
+        html.P([
+            html.I(className="fas fa-info-circle mr-2"),
+            "Klik op een onderdeel met (+) om de onderliggende koppen te tonen, en nog een keer om ze te verbergen."
+        ], className="table-description")
+    ])
+
+# Function to create the mindmap figure for the visible part of a heading tree
+@timed()
+def create_mindmap_figure(tree, expanded=(), layout=MINDMAP_LAYOUT, max_level=MINDMAP_MAX_LEVEL):
+    """Create the mindmap figure with the headings up to max_level plus the children of expanded nodes"""
+    nodes = tree['nodes']
+    expanded = set(expanded)
+    
+    # Visible frontier: parents come before their children, so one pass in heading order suffices
+    root_id = MINDMAP_ROOT
+    parents = {}
+    hidden_children = {}
+    for node_id, parent in tree['parents'].items():
+        if parent != root_id and parent not in parents:
+            continue
+        if nodes[node_id]['level'] <= max_level or parent in expanded:
+            parents[node_id] = parent
         else:
-            # Find the closest parent level
-            parent_level = heading['level'] - 1
-            while parent_level > 0 and parent_level not in parent_map:
-                parent_level -= 1
-            
-            if parent_level in parent_map:
-                G.add_edge(parent_map[parent_level], node_id)
-            else:
-                # If no parent found, connect to root
-                G.add_edge(root_id, node_id)
-            
-            # Update parent map
-            parent_map[heading['level']] = node_id
+            hidden_children[parent] = hidden_children.get(parent, 0) + 1
+    
+    # Track node levels for styling
+    node_levels = {root_id: 0}
+    for node_id in parents:
+        node_levels[node_id] = nodes[node_id]['level']
     
-    # Calculate node positions using a more spaced layout
-    pos = nx.spring_layout(G, k=1.0, iterations=100, seed=42)
+    # Calculate node positions with a tree layout for the visible nodes only, cached per structure
+    pos = tree_positions(root_id, parents, layout)
     
     # Create node traces with different sizes and colors based on level
     node_traces = []
@@ -579,19 +427,26 @@ def create_mindmap(headings):
         2: 30,  # Level 2
     }
     
-    # Create edges first so they appear behind nodes
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
+    # Large trees are drawn with WebGL, which keeps the browser responsive with many nodes
+    scatter = go.Scattergl if len(node_levels) > MINDMAP_WEBGL_NODES else go.Scatter
+    
+    # Create edges first so they appear behind nodes; one trace per colour, segments separated by None
+    edge_segments = {}
+    for node, parent in parents.items():
+        x0, y0 = pos[parent]
+        x1, y1 = pos[node]
         
         # Get the level of the target node for edge color
-        target_level = node_levels.get(edge[1], 2)
-        edge_color = colors.get(target_level, '#A5AA99')
-        
+        edge_color = colors.get(node_levels.get(node, 2), '#A5AA99')
+        segments = edge_segments.setdefault(edge_color, ([], []))
+        segments[0].extend([x0, x1, None])
+        segments[1].extend([y0, y1, None])
+    
+    for edge_color, (edge_x, edge_y) in edge_segments.items():
         # Create edge trace with thicker lines
-        edge_trace = go.Scatter(
-            x=[x0, x1], 
-            y=[y0, y1],
+        edge_trace = scatter(
+            x=edge_x,
+            y=edge_y,
             mode='lines',
             line=dict(width=3, color=edge_color, dash='solid'),
             hoverinfo='none',
@@ -618,19 +473,19 @@ def create_mindmap(headings):
             node_x.append(x)
             node_y.append(y)
             
-            # Get the label if available, otherwise use the node ID
-            if 'label' in G.nodes[node]:
-                label = G.nodes[node]['label']
-                # Truncate long labels for display but keep full text for hover
-                display_label = label if len(label) < 30 else label[:27] + '...'
+            # Truncate long labels for display but keep full text for hover
+            label = nodes[node]['label']
+            display_label = label if len(label) < 30 else label[:27] + '...'
+            if node in hidden_children:
+                # Mark nodes that can be expanded
+                node_text.append(f"{display_label} (+{hidden_children[node]})")
+                node_info.append(f"{label}<br><i>Klik om {hidden_children[node]} onderliggende koppen te tonen</i>")
+            else:
                 node_text.append(display_label)
                 node_info.append(label)
-            else:
-                node_text.append(node)
-                node_info.append(node)
         
         # Create the node trace with larger text
-        node_trace = go.Scatter(
+        node_trace = scatter(
             x=node_x, 
             y=node_y,
             mode='markers+text',
@@ -643,6 +498,7 @@ def create_mindmap(headings):
             text=node_text,
             hovertext=node_info,
             hoverinfo='text',
+            customdata=level_nodes,
             textposition="bottom center",
             textfont=dict(
                 family="Arial",
@@ -704,12 +560,13 @@ def create_mindmap(headings):
         ]
     )
     
-    return dcc.Graph(figure=fig, config={'displayModeBar': False})
+    return fig
 
 # Function to create financial chart
-def create_financial_chart(financial_data):
+@timed()
+def create_financial_chart(facts):
     """Create a bar chart for financial data with improved visualization"""
-    if not financial_data:
+    if not len(facts):
         return {
             'data': [],
             'layout': {
@@ -718,11 +575,8 @@ def create_financial_chart(financial_data):
             }
         }
     
-    # Create a DataFrame for the chart
-    df = pd.DataFrame(financial_data)
-    
-    # Group by category and sum amounts
-    df_grouped = df.groupby('category')['amount'].sum().reset_index()
+    # Amounts summed per category, precomputed by the fact store
+    df_grouped = facts.rollup()[['category', 'amount']]
     
     # Sort by amount for better visualization
     df_grouped = df_grouped.sort_values('amount', ascending=False).head(8)  # Show top 8 categories
@@ -776,9 +630,10 @@ def create_financial_chart(financial_data):
     return fig
 
 # Function to create financial pie chart
-def create_financial_pie_chart(financial_data):
+@timed()
+def create_financial_pie_chart(facts):
     """Create a pie chart for financial data with improved visualization"""
-    if not financial_data:
+    if not len(facts):
         return {
             'data': [],
             'layout': {
@@ -787,11 +642,8 @@ def create_financial_pie_chart(financial_data):
             }
         }
     
-    # Create a DataFrame for the chart
-    df = pd.DataFrame(financial_data)
-    
-    # Group by category and sum amounts
-    df_grouped = df.groupby('category')['amount'].sum().reset_index()
+    # Amounts summed per category, precomputed by the fact store
+    df_grouped = facts.rollup()[['category', 'amount']]
     
     # Sort by amount for better visualization
     df_grouped = df_grouped.sort_values('amount', ascending=False)
@@ -872,6 +724,7 @@ def create_financial_pie_chart(financial_data):
     return fig
 
 # Function to create topics chart
+@timed()
 def create_topics_chart(topics):
     """Create a bar chart for top topics"""
     if topics:
@@ -900,6 +753,222 @@ def create_topics_chart(topics):
     
     return fig_topics
 
+# Function to create the statistics cards
+@timed()
+def create_statistics(metrics):
+    """Create the row of statistics cards"""
+    statistics_items = [
+        html.Div([
+            html.I(className="fas fa-book fa-2x", style={"color": "#005A9C"}),
+            html.P(metrics['total_sections'], className="stat-value"),
+            html.P("Secties", className="stat-label")
+        ], className="stat-item"),
+        html.Div([
+            html.I(className="fas fa-paragraph fa-2x", style={"color": "#005A9C"}),
+            html.P(metrics['total_paragraphs'], className="stat-value"),
+            html.P("Paragrafen", className="stat-label")
+        ], className="stat-item"),
+        html.Div([
+            html.I(className="fas fa-list-ul fa-2x", style={"color": "#005A9C"}),
+            html.P(metrics['total_list_items'], className="stat-value"),
+            html.P("Lijstitems", className="stat-label")
+        ], className="stat-item"),
+        html.Div([
+            html.I(className="fas fa-table fa-2x", style={"color": "#005A9C"}),
+            html.P(metrics['total_tables'], className="stat-value"),
+            html.P("Tabellen", className="stat-label")
+        ], className="stat-item"),
+        html.Div([
+            html.I(className="fas fa-euro-sign fa-2x", style={"color": "#005A9C"}),
+            html.P(len(metrics['financial_facts']['amounts']), className="stat-value"),
+            html.P("Financiële Items", className="stat-label")
+        ], className="stat-item")
+    ]
+    
+    return statistics_items
+
+# Function to create a DataTable that pages, sorts and filters on the server
+@timed()
+def create_data_table(name, frame, names):
+    """Create a DataTable showing the first page of frame; later pages come from update_data_table_page"""
+    records, page_count = query_page(frame)
+    return dash_table.DataTable(
+        id={'type': 'data-table', 'index': name},
+        data=records,
+        columns=[{'name': column_name, 'id': column_id} for column_id, column_name in zip(frame.values.columns, names)],
+        page_action='custom',
+        page_current=0,
+        page_size=PAGE_SIZE,
+        page_count=page_count,
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        style_table={'overflowX': 'auto'},
+        style_cell={
+            'textAlign': 'left',
+            'padding': '10px',
+            'whiteSpace': 'normal',
+            'height': 'auto',
+            'minWidth': '100px',
+            'maxWidth': '300px',
+            'overflow': 'hidden',
+            'textOverflow': 'ellipsis'
+        },
+        style_header={
+            'backgroundColor': '#005A9C',
+            'color': 'white',
+            'fontWeight': 'bold',
+            'textAlign': 'left',
+            'padding': '12px'
+        },
+        style_data_conditional=[
+            {
+                'if': {'row_index': 'odd'},
+                'backgroundColor': '#f9f9f9'
+            }
+        ],
+        style_as_list_view=True,
+        tooltip_delay=0,
+        tooltip_duration=None
+    )
+
+# Function to put the extracted financial items in a frame for the financial table
+def financial_frame(facts):
+    """Return a TableFrame of the financial items; the amount column is numeric"""
+    # Rows of the fact store, with the category and original text of every item
+    df = facts.to_frame()
+    
+    # Rename columns for better understanding
+    column_mapping = {
+        'description': 'Beschrijving',
+        'amount': 'Bedrag'
+    }
+    df = df.rename(columns=column_mapping)
+    
+    # Remove the source column if it exists
+    if 'source' in df.columns:
+        df = df.drop(columns=['source'])
+    
+    amounts = df[['Bedrag']].astype(float) if 'Bedrag' in df.columns else pd.DataFrame(index=df.index)
+    return TableFrame(df, amounts)
+
+# Function to put the typed columns of a table in a frame for its table view
+def columns_frame(columns):
+    """Return a TableFrame with the cell texts by column position; numeric columns also get their amounts"""
+    ids = [str(i) for i in range(len(columns))]
+    values = pd.DataFrame({column_id: column['values'] for column_id, column in zip(ids, columns)})
+    amounts = pd.DataFrame({
+        column_id: pd.to_numeric(pd.Series(column['amounts'], dtype=object), errors='coerce')
+        for column_id, column in zip(ids, columns) if column['type'] == 'numeric'
+    }, index=values.index)
+    return TableFrame(values, amounts)
+
+# Function to create the financial table
+@timed()
+def create_financial_table(facts):
+    """Create the table listing every extracted financial item"""
+    if len(facts):
+        frame = financial_frame(facts)
+        financial_table = [
+            html.H3([
+                html.I(className="fas fa-euro-sign mr-2", style={"color": "#005A9C"}),
+                "Financiële Gegevens"
+            ]),
+            create_data_table('financial', frame, list(frame.values.columns))
+        ]
+    else:
+        financial_table = [
+            html.Div([
+                html.I(className="fas fa-exclamation-circle fa-3x", style={"color": "#E94E24"}),
+                html.P("Geen financiële gegevens beschikbaar")
+            ], style={"textAlign": "center", "padding": "40px"})
+        ]
+    
+    return financial_table
+
+# Function to create the table view and pie chart of one table
+@timed()
+def create_table_body(table, columns, table_index):
+    """Create the table view and pie chart for the typed columns of one table"""
+    # Side by side layout for table and chart
+    return html.Div([
+        # Table view, paged on the server from the columns normalized at ingest
+        html.Div([
+            html.H4([
+                html.I(className="fas fa-list mr-2"),
+                "Tabelgegevens"
+            ], className="section-subtitle"),
+            create_data_table(f"table-{table_index}", columns_frame(columns), [column['name'] for column in columns])
+        ], className="table-view"),
+        
+        # Chart view
+        html.Div([
+            html.H4([
+                html.I(className="fas fa-chart-pie mr-2"),
+                "Visualisatie"
+            ], className="section-subtitle"),
+            create_pie_chart_for_table(columns, table_index)
+        ], className="chart-view")
+    ], className="table-chart-container")
+
+# Function to create the tables section
+@timed()
+def create_tables_section(tables):
+    """Create a collapsed container for every scraped table; its table view and pie chart are loaded when it is opened"""
+    tables_section = []
+    for i, table in enumerate(tables):
+        if table['headers'] or table['rows']:
+            # Generate a meaningful title based on table content
+            title = "Gegevens"
+            if table['headers']:
+                # Try to find a meaningful title from the headers
+                potential_titles = [h for h in table['headers'] if len(h) > 3 and not re.match(r'^[-+]?\d+(\.\d+)?$', h)]
+                if potential_titles:
+                    title = potential_titles[0]
+            
+            # Create a container for this table; the browser opens and closes it without a round trip
+            table_container = html.Details([
+                html.Summary([
+                    html.I(className="fas fa-table mr-2", style={"color": "#005A9C"}),
+                    f"Tabel {i+1}: {title}"
+                ], id={'type': 'table-toggle', 'index': i}, className="table-title"),
+                
+                # Add a description based on the headers
+                html.P([
+                    html.I(className="fas fa-info-circle mr-2"),
+                    f"Deze tabel toont informatie over {', '.join(table['headers'][:3]) if table['headers'] else 'verschillende gegevens'} uit de Voorjaarsnota."
+                ], className="table-description"),
+                
+                # Filled by load_table_body() the first time the table is opened
+                dcc.Loading(html.Div(id={'type': 'table-body', 'index': i}, className="table-body"), type="circle")
+            ], className="table-container")
+            
+            tables_section.append(table_container)
+    
+    if not tables_section:
+        tables_section = [
+            html.Div([
+                html.I(className="fas fa-exclamation-circle fa-3x", style={"color": "#E94E24"}),
+                html.P("Geen tabellen beschikbaar in de Voorjaarsnota")
+            ], style={"textAlign": "center", "padding": "40px"})
+        ]
+    
+    return tables_section
+
+# Function to create the last updated line
+@timed()
+def create_last_updated(last_updated_iso):
+    """Show the time the snapshot was scraped, not the time it was rendered"""
+    try:
+        last_updated = datetime.datetime.fromisoformat(last_updated_iso).strftime("%d-%m-%Y %H:%M:%S")
+        last_updated_div = html.P(f"Laatst bijgewerkt: {last_updated}", className="last-updated")
+    except (TypeError, ValueError):
+        last_updated_div = html.P("Laatst bijgewerkt: onbekend", className="last-updated")
+    
+    return last_updated_div
+
 # Initialize the Dash app
 app = dash.Dash(__name__, title="Gemeente Rotterdam Voorjaarsnota 2024 Dashboard")
 
@@ -912,6 +981,15 @@ app.layout = html.Div([
         n_intervals=0
     ),
     
+    # Version of the snapshot on the server, polled from /api/version
+    dcc.Store(id='data-version'),
+    
+    # Rendered sections persisted in the browser, keyed by data version
+    dcc.Store(id='section-cache', storage_type='local'),
+    
+    # Version the server has to render because the browser has no copy of it
+    dcc.Store(id='sections-request'),
+    
     # Header
     html.Div([
         html.H1([
@@ -1062,6 +1140,23 @@ app.layout = html.Div([
         ], className="timeline-section")
     ], className="dashboard-section introduction-section"),
     
+    # Search section
+    html.Div([
+        html.H2([
+            html.I(className="fas fa-search mr-2"),
+            "Zoeken in de Voorjaarsnota"
+        ]),
+        html.P("Zoek in alle koppen, alinea's en opsommingen. Zet woorden tussen aanhalingstekens om op een exacte zin te zoeken, bijvoorbeeld \"algemene reserve\".", className="search-help"),
+        dcc.Input(
+            id='search-input',
+            type='search',
+            placeholder="Bijvoorbeeld: jeugdzorg of \"Rotterdamse Investeringsmotor\"",
+            debounce=True,
+            className="search-input"
+        ),
+        html.Div(id='search-results')
+    ], className="dashboard-section"),
+    
     # Financial charts section
     html.Div([
         html.H2([
@@ -1321,6 +1416,15 @@ app.index_string = '''
                 font-size: 20px;
             }
             
+            summary.table-title {
+                cursor: pointer;
+                font-weight: bold;
+            }
+            
+            .table-container:not([open]) summary.table-title {
+                margin-bottom: 0;
+            }
+            
             .table-description {
                 color: #666;
                 margin-bottom: 20px;
@@ -1508,6 +1612,56 @@ app.index_string = '''
                 font-size: 14px;
             }
             
+            /* Search styles */
+            .search-help {
+                color: #666;
+                font-size: 14px;
+            }
+            
+            .search-input {
+                width: 100%;
+                box-sizing: border-box;
+                padding: 10px 15px;
+                font-size: 16px;
+                border: 1px solid #ccc;
+                border-radius: 8px;
+            }
+            
+            .search-count {
+                margin: 15px 0 5px;
+                font-size: 14px;
+                color: #888;
+            }
+            
+            .search-hit {
+                padding: 12px 0;
+                border-bottom: 1px solid #f0f0f0;
+            }
+            
+            .search-hit a {
+                color: #005A9C;
+                font-weight: bold;
+                text-decoration: none;
+            }
+            
+            .search-kind {
+                margin-left: 8px;
+                font-size: 12px;
+                color: #888;
+            }
+            
+            .search-hit p {
+                margin: 5px 0 0;
+                color: #555;
+                font-size: 14px;
+                line-height: 1.5;
+            }
+            
+            .search-hit mark {
+                background-color: #FFE08A;
+                padding: 0 2px;
+            }
+            
             /* Responsive adjustments */
             @media (max-width: 768px) {
                 .two-column-layout {
@@ -1566,255 +1720,434 @@ app.index_string = '''
 </html>
 '''
 
-# Define callback to update the dashboard
+# Function to get the processed metrics for a snapshot
+def get_metrics(snapshot):
+    """Return the process_data() results for a snapshot, computed once per version"""
+    return artifacts.get_or_build(snapshot.version, 'metrics', lambda: process_data(snapshot.data, open_corpus(snapshot)))
+
+# Function to get the financial fact store for a snapshot
+def get_facts(snapshot):
+    """Return the FinancialFacts of a snapshot, rebuilt from the cached metrics once per version and process"""
+    return frames.get_or_build(snapshot.version, 'financial-facts', lambda: FinancialFacts.from_dict(get_metrics(snapshot)['financial_facts']))
+
+# Function to get the full-text search index of a snapshot
+def get_search_index(snapshot):
+    """Return the SearchIndex of a snapshot, built once per version and process from the shared corpus"""
+    return frames.get_or_build(snapshot.version, 'search-index', lambda: build_search_index(
+        open_corpus(snapshot), snapshot.data['headings'], snapshot.data.get('pages'), URL
+    ))
+
+# Function to get a dashboard section of a snapshot
+def build_section(snapshot, name, build):
+    """Return the section built by build(snapshot), computed once per version"""
+    return artifacts.get_or_build(snapshot.version, name, lambda: build(snapshot))
+
+# Function to get a dashboard section for the current snapshot
+def get_section(version, name, build):
+    """Return a cached section for the current snapshot, or no_update if there is no version yet"""
+    if not version:
+        return dash.no_update
+    return build_section(load_snapshot(), name, build)
+
+# Functions building each dashboard section from a snapshot
+def build_financial_charts(snapshot):
+    facts = get_facts(snapshot)
+    return [create_financial_chart(facts), create_financial_pie_chart(facts)]
+
+def build_topics_chart(snapshot):
+    return create_topics_chart(get_metrics(snapshot)['top_topics'])
+
+def build_statistics(snapshot):
+    return create_statistics(get_metrics(snapshot))
+
+def build_financial_table(snapshot):
+    return create_financial_table(get_facts(snapshot))
+
+def build_mindmap(snapshot):
+    return create_mindmap(snapshot.data['headings'])
+
+def build_tables_section(snapshot):
+    return create_tables_section(snapshot.data['tables'])
+
+def build_last_updated(snapshot):
+    return create_last_updated(get_metrics(snapshot)['last_updated'])
+
+# Function to build all dashboard outputs for a snapshot
+def build_dashboard(snapshot):
+    """Build the outputs of all dashboard sections, in layout order"""
+    return [
+        *build_section(snapshot, 'financial-charts', build_financial_charts),
+        build_section(snapshot, 'topics-chart', build_topics_chart),
+        build_section(snapshot, 'statistics', build_statistics),
+        build_section(snapshot, 'financial-table', build_financial_table),
+        build_section(snapshot, 'headings-mindmap', build_mindmap),
+        build_section(snapshot, 'tables-section', build_tables_section),
+        build_section(snapshot, 'last-updated', build_last_updated)
+    ]
+
+# Function to update the whole dashboard at once (used by scripts; the app uses the callbacks below)
+@timed()
+def update_dashboard(n_intervals):
+    """Return the outputs of every dashboard section for the current snapshot"""
+    return build_dashboard(load_snapshot())
+
+# Dashboard sections as (component id, property), in layout order
+SECTION_OUTPUTS = [
+    ('financial-chart', 'figure'),
+    ('financial-pie-chart', 'figure'),
+    ('topics-chart', 'figure'),
+    ('statistics', 'children'),
+    ('financial-table', 'children'),
+    ('headings-mindmap', 'children'),
+    ('tables-section', 'children'),
+    ('last-updated', 'children')
+]
+
+# Lightweight endpoint clients poll to find out whether the data changed
+@app.server.route(f"{app.config.routes_pathname_prefix}api/version")
+def data_version_endpoint():
+    snapshot = load_snapshot()
+    response = flask.jsonify(version=snapshot.version, last_updated=snapshot.data.get('last_updated'))
+    response.set_etag(snapshot.version)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Answers 304 Not Modified when the browser already has this version
+    return response.make_conditional(flask.request)
+
+# Prometheus metrics of this process (timings, cache lookups and payload sizes)
+@app.server.route(f"{app.config.routes_pathname_prefix}metrics")
+def metrics_endpoint():
+    return flask.Response(registry.render(), content_type=CONTENT_TYPE)
+
+# Time every callback request and record the size of its response, by output
+@app.server.before_request
+def start_request_timer():
+    flask.g.request_start = time.perf_counter()
+
+# Output labels of all registered callbacks, collected on the first callback request once every callback exists
+_callback_labels = None
+
+# Helper function to return the output labels of the registered callbacks
+def callback_labels():
+    global _callback_labels
+    if _callback_labels is None:
+        _callback_labels = frozenset(output_label(registered) for registered in app.callback_map)
+    return _callback_labels
+
+@app.server.after_request
+def record_callback_metrics(response):
+    if flask.request.path.endswith('_dash-update-component') and 'request_start' in flask.g:
+        body = flask.request.get_json(silent=True) or {}
+        # Label by callback, not by component: pattern-matching ids collapse to their type, anything unregistered is 'unknown'
+        output = output_label(str(body.get('output', '')))
+        if output not in callback_labels():
+            output = 'unknown'
+        REQUEST_SECONDS.observe(time.perf_counter() - flask.g.request_start, output)
+        PAYLOAD_BYTES.observe(response.calculate_content_length() or 0, output)
+    return response
+
+# Define clientside callback polling the version endpoint instead of recomputing on every tick
+app.clientside_callback(
+    """
+    async function(n_intervals, current_version) {
+        const config = JSON.parse(document.getElementById('_dash-config').textContent);
+        const response = await fetch(config.requests_pathname_prefix + 'api/version', {cache: 'no-cache'});
+        if (!response.ok) {
+            return window.dash_clientside.no_update;
+        }
+        const body = await response.json();
+        return body.version === current_version ? window.dash_clientside.no_update : body.version;
+    }
+    """,
+    dash.dependencies.Output('data-version', 'data'),
+    [dash.dependencies.Input('interval-component', 'n_intervals')],
+    [dash.dependencies.State('data-version', 'data')]
+)
+
+# Define clientside callback restoring sections from the browser, or asking the server for them
+app.clientside_callback(
+    """
+    function(version, cache) {
+        const no_update = window.dash_clientside.no_update;
+        const keys = %s;
+        if (!version) {
+            return keys.map(() => no_update).concat([no_update]);
+        }
+        if (cache && cache.version === version && keys.every(key => key in cache.sections)) {
+            return keys.map(key => cache.sections[key]).concat([no_update]);
+        }
+        return keys.map(() => no_update).concat([version]);
+    }
+    """ % json.dumps([f"{component_id}.{prop}" for component_id, prop in SECTION_OUTPUTS]),
+    [dash.dependencies.Output(component_id, prop, allow_duplicate=True) for component_id, prop in SECTION_OUTPUTS]
+    + [dash.dependencies.Output('sections-request', 'data')],
+    [dash.dependencies.Input('data-version', 'data')],
+    [dash.dependencies.State('section-cache', 'data')],
+    prevent_initial_call=True
+)
+
+# Define clientside callback saving sections rendered by the server in the browser
+app.clientside_callback(
+    """
+    function() {
+        const args = Array.from(arguments);
+        const [request, version, cache] = args.slice(-3);
+        // Sections restored from the browser cache are not written back
+        if (!request || request !== version) {
+            return window.dash_clientside.no_update;
+        }
+        const sections = (cache && cache.version === request) ? Object.assign({}, cache.sections) : {};
+        window.dash_clientside.callback_context.triggered.forEach(function(item) {
+            if (item.value !== undefined && item.value !== null) {
+                sections[item.prop_id] = item.value;
+            }
+        });
+        return {version: request, sections: sections};
+    }
+    """,
+    dash.dependencies.Output('section-cache', 'data'),
+    [dash.dependencies.Input(component_id, prop) for component_id, prop in SECTION_OUTPUTS],
+    [
+        dash.dependencies.State('sections-request', 'data'),
+        dash.dependencies.State('data-version', 'data'),
+        dash.dependencies.State('section-cache', 'data')
+    ],
+    prevent_initial_call=True
+)
+
+# Define callbacks rendering each dashboard section when the browser has no copy of this version
 @app.callback(
     [
         dash.dependencies.Output('financial-chart', 'figure'),
-        dash.dependencies.Output('financial-pie-chart', 'figure'),
-        dash.dependencies.Output('topics-chart', 'figure'),
-        dash.dependencies.Output('statistics', 'children'),
-        dash.dependencies.Output('financial-table', 'children'),
-        dash.dependencies.Output('headings-mindmap', 'children'),
-        dash.dependencies.Output('tables-section', 'children'),
-        dash.dependencies.Output('last-updated', 'children')
+        dash.dependencies.Output('financial-pie-chart', 'figure')
     ],
-    [dash.dependencies.Input('interval-component', 'n_intervals')]
+    [dash.dependencies.Input('sections-request', 'data')]
 )
-def update_dashboard(n_intervals):
-    # Scrape and process data
-    data = scrape_data()
-    metrics = process_data(data)
-    
-    # Create financial chart
-    financial_chart = create_financial_chart(metrics['financial_data'])
-    
-    # Create financial pie chart
-    financial_pie_chart = create_financial_pie_chart(metrics['financial_data'])
-    
-    # Create topics chart
-    topics_chart = create_topics_chart(metrics['top_topics'])
-    
-    # Create statistics
-    statistics_items = [
-        html.Div([
-            html.I(className="fas fa-book fa-2x", style={"color": "#005A9C"}),
-            html.P(metrics['total_sections'], className="stat-value"),
-            html.P("Secties", className="stat-label")
-        ], className="stat-item"),
-        html.Div([
-            html.I(className="fas fa-paragraph fa-2x", style={"color": "#005A9C"}),
-            html.P(metrics['total_paragraphs'], className="stat-value"),
-            html.P("Paragrafen", className="stat-label")
-        ], className="stat-item"),
-        html.Div([
-            html.I(className="fas fa-list-ul fa-2x", style={"color": "#005A9C"}),
-            html.P(metrics['total_list_items'], className="stat-value"),
-            html.P("Lijstitems", className="stat-label")
-        ], className="stat-item"),
-        html.Div([
-            html.I(className="fas fa-table fa-2x", style={"color": "#005A9C"}),
-            html.P(metrics['total_tables'], className="stat-value"),
-            html.P("Tabellen", className="stat-label")
-        ], className="stat-item"),
-        html.Div([
-            html.I(className="fas fa-euro-sign fa-2x", style={"color": "#005A9C"}),
-            html.P(len(metrics['financial_data']), className="stat-value"),
-            html.P("Financiële Items", className="stat-label")
-        ], className="stat-item")
-    ]
-    
-    # Create financial table
-    if metrics['financial_data']:
-        # Create a DataFrame from the financial data
-        df = pd.DataFrame(metrics['financial_data'])
-        
-        # Rename columns for better understanding
-        column_mapping = {
-            'description': 'Beschrijving',
-            'amount': 'Bedrag'
-        }
-        df = df.rename(columns=column_mapping)
-        
-        # Remove the source column if it exists
-        if 'source' in df.columns:
-            df = df.drop(columns=['source'])
-        
-        financial_table = [
-            html.H3([
-                html.I(className="fas fa-euro-sign mr-2", style={"color": "#005A9C"}),
-                "Financiële Gegevens"
-            ]),
-            dash_table.DataTable(
-                data=df.to_dict('records'),
-                columns=[{'name': col, 'id': col} for col in df.columns],
-                style_table={'overflowX': 'auto'},
-                style_cell={
-                    'textAlign': 'left',
-                    'padding': '10px',
-                    'whiteSpace': 'normal',
-                    'height': 'auto',
-                    'minWidth': '100px',
-                    'maxWidth': '300px',
-                    'overflow': 'hidden',
-                    'textOverflow': 'ellipsis'
-                },
-                style_header={
-                    'backgroundColor': '#005A9C',
-                    'color': 'white',
-                    'fontWeight': 'bold',
-                    'textAlign': 'left',
-                    'padding': '12px'
-                },
-                style_data_conditional=[
-                    {
-                        'if': {'row_index': 'odd'},
-                        'backgroundColor': '#f9f9f9'
-                    }
-                ],
-                page_size=10,
-                style_as_list_view=True,
-                tooltip_delay=0,
-                tooltip_duration=None
-            )
-        ]
+def update_financial_charts(version):
+    if not version:
+        return dash.no_update, dash.no_update
+    return get_section(version, 'financial-charts', build_financial_charts)
+
+@app.callback(
+    dash.dependencies.Output('topics-chart', 'figure'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_topics_chart(version):
+    return get_section(version, 'topics-chart', build_topics_chart)
+
+@app.callback(
+    dash.dependencies.Output('statistics', 'children'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_statistics(version):
+    return get_section(version, 'statistics', build_statistics)
+
+@app.callback(
+    dash.dependencies.Output('financial-table', 'children'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_financial_table(version):
+    return get_section(version, 'financial-table', build_financial_table)
+
+@app.callback(
+    dash.dependencies.Output('headings-mindmap', 'children'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_mindmap(version):
+    return get_section(version, 'headings-mindmap', build_mindmap)
+
+# Function to get the full heading tree of a snapshot
+def get_heading_tree(snapshot):
+    """Return the mindmap tree of all headings, built once per version"""
+    return artifacts.get_or_build(snapshot.version, 'heading-tree', lambda: heading_tree(snapshot.data['headings']))
+
+# Define callback loading (or hiding) the deeper headings of a clicked mindmap node
+@app.callback(
+    [
+        dash.dependencies.Output({'type': 'mindmap-graph', 'index': dash.dependencies.MATCH}, 'figure'),
+        dash.dependencies.Output({'type': 'mindmap-expanded', 'index': dash.dependencies.MATCH}, 'data')
+    ],
+    [dash.dependencies.Input({'type': 'mindmap-graph', 'index': dash.dependencies.MATCH}, 'clickData')],
+    [dash.dependencies.State({'type': 'mindmap-expanded', 'index': dash.dependencies.MATCH}, 'data')],
+    prevent_initial_call=True
+)
+def toggle_mindmap_node(click_data, expanded):
+    node = (click_data or {}).get('points', [{}])[0].get('customdata')
+    tree = get_heading_tree(load_snapshot())
+    expanded = list(expanded or [])
+    
+    if node in expanded:
+        # Collapse the node together with everything expanded below it
+        collapsed = {node}
+        for node_id, parent in tree['parents'].items():
+            if parent in collapsed:
+                collapsed.add(node_id)
+        expanded = [node_id for node_id in expanded if node_id not in collapsed]
+    elif any(parent == node and tree['nodes'][node_id]['level'] > MINDMAP_MAX_LEVEL for node_id, parent in tree['parents'].items()):
+        expanded.append(node)
     else:
-        financial_table = [
-            html.Div([
-                html.I(className="fas fa-exclamation-circle fa-3x", style={"color": "#E94E24"}),
-                html.P("Geen financiële gegevens beschikbaar")
-            ], style={"textAlign": "center", "padding": "40px"})
-        ]
-    
-    # Create mindmap
-    mindmap = create_mindmap(data['headings'])
-    
-    # Create tables section
-    tables_section = []
-    for i, table in enumerate(data['tables']):
-        if table['headers'] or table['rows']:
-            # Create a DataFrame from the table data
-            if table['headers'] and table['rows']:
-                # If there are headers and rows, use headers as column names
-                # Ensure all rows have the same length as headers
-                uniform_rows = []
-                for row in table['rows']:
-                    # Pad or truncate row to match headers length
-                    if len(row) < len(table['headers']):
-                        uniform_rows.append(row + [''] * (len(table['headers']) - len(row)))
-                    else:
-                        uniform_rows.append(row[:len(table['headers'])])
-                
-                df = pd.DataFrame(uniform_rows, columns=table['headers'])
-            elif table['rows']:
-                # If no headers but rows exist, use generic column names
-                max_cols = max([len(row) for row in table['rows']])
-                columns = [f"Column {i+1}" for i in range(max_cols)]
-                
-                uniform_rows = []
-                for row in table['rows']:
-                    # Pad or truncate row to match max columns
-                    if len(row) < max_cols:
-                        uniform_rows.append(row + [''] * (max_cols - len(row)))
-                    else:
-                        uniform_rows.append(row[:max_cols])
-                
-                df = pd.DataFrame(uniform_rows, columns=columns)
-            else:
-                # Empty table with just headers
-                df = pd.DataFrame(columns=table['headers'])
-            
-            # Generate a meaningful title based on table content
-            title = "Gegevens"
-            if table['headers']:
-                # Try to find a meaningful title from the headers
-                potential_titles = [h for h in table['headers'] if len(h) > 3 and not re.match(r'^[-+]?\d+(\.\d+)?$', h)]
-                if potential_titles:
-                    title = potential_titles[0]
-            
-            # Create a container for this table
-            table_container = html.Div([
-                html.H3([
-                    html.I(className="fas fa-table mr-2", style={"color": "#005A9C"}),
-                    f"Tabel {i+1}: {title}"
-                ], className="table-title"),
-                
-                # Add a description based on the headers
-                html.P([
-                    html.I(className="fas fa-info-circle mr-2"),
-                    f"Deze tabel toont informatie over {', '.join(table['headers'][:3]) if table['headers'] else 'verschillende gegevens'} uit de Voorjaarsnota."
-                ], className="table-description"),
-                
-                # Side by side layout for table and chart
-                html.Div([
-                    # Table view
-                    html.Div([
-                        html.H4([
-                            html.I(className="fas fa-list mr-2"),
-                            "Tabelgegevens"
-                        ], className="section-subtitle"),
-                        dash_table.DataTable(
-                            data=df.to_dict('records'),
-                            columns=[{'name': col, 'id': col} for col in df.columns],
-                            style_table={'overflowX': 'auto'},
-                            style_cell={
-                                'textAlign': 'left',
-                                'padding': '10px',
-                                'whiteSpace': 'normal',
-                                'height': 'auto',
-                                'minWidth': '100px',
-                                'maxWidth': '300px',
-                                'overflow': 'hidden',
-                                'textOverflow': 'ellipsis'
-                            },
-                            style_header={
-                                'backgroundColor': '#005A9C',
-                                'color': 'white',
-                                'fontWeight': 'bold',
-                                'textAlign': 'left',
-                                'padding': '12px'
-                            },
-                            style_data_conditional=[
-                                {
-                                    'if': {'row_index': 'odd'},
-                                    'backgroundColor': '#f9f9f9'
-                                }
-                            ],
-                            page_size=10,
-                            style_as_list_view=True,
-                            tooltip_delay=0,
-                            tooltip_duration=None
-                        )
-                    ], className="table-view"),
-                    
-                    # Chart view
-                    html.Div([
-                        html.H4([
-                            html.I(className="fas fa-chart-pie mr-2"),
-                            "Visualisatie"
-                        ], className="section-subtitle"),
-                        create_pie_chart_for_table(df, i)
-                    ], className="chart-view")
-                ], className="table-chart-container")
-            ], className="table-container")
-            
-            tables_section.append(table_container)
+        # Nothing to load for this node (or it is not part of the current data)
+        return dash.no_update, dash.no_update
     
-    if not tables_section:
-        tables_section = [
-            html.Div([
-                html.I(className="fas fa-exclamation-circle fa-3x", style={"color": "#E94E24"}),
-                html.P("Geen tabellen beschikbaar in de Voorjaarsnota")
-            ], style={"textAlign": "center", "padding": "40px"})
-        ]
+    return create_mindmap_figure(tree, expanded), expanded
+
+# Define callback rendering a table the first time its container is opened
+@app.callback(
+    [
+        dash.dependencies.Output({'type': 'table-body', 'index': dash.dependencies.MATCH}, 'children'),
+        dash.dependencies.Output({'type': 'table-body', 'index': dash.dependencies.MATCH}, 'className')
+    ],
+    [dash.dependencies.Input({'type': 'table-toggle', 'index': dash.dependencies.MATCH}, 'n_clicks')],
+    [dash.dependencies.State({'type': 'table-body', 'index': dash.dependencies.MATCH}, 'className')],
+    prevent_initial_call=True
+)
+def load_table_body(n_clicks, class_name):
+    # Already rendered: opening and closing again is handled by the browser
+    if 'loaded' in (class_name or '').split():
+        return dash.no_update, dash.no_update
+    
+    index = dash.callback_context.triggered_id['index']
+    body = get_table_body(load_snapshot(), index)
+    if body is None:
+        return dash.no_update, dash.no_update
+    return body, "table-body loaded"
+
+# Function to get the table view and pie chart of one table
+def get_table_body(snapshot, index):
+    """Return the cached body of table index, or None if the snapshot has no such table"""
+    tables = snapshot.data['tables']
+    if index >= len(tables):
+        return None
+    return artifacts.get_or_build(
+        snapshot.version,
+        f"table-{index}",
+        lambda: create_table_body(tables[index], table_columns([tables[index]])[0], index)
+    )
+
+# Function to get the frame behind a server-side DataTable
+def get_table_frame(snapshot, name):
+    """Return the cached TableFrame of the 'financial' table or a 'table-N' table view, or None if it does not exist"""
+    if name == 'financial':
+        return frames.get_or_build(snapshot.version, name, lambda: financial_frame(get_facts(snapshot)))
+    
+    tables = snapshot.data['tables']
+    index = int(name.rsplit('-', 1)[1])
+    if index >= len(tables):
+        return None
+    return frames.get_or_build(snapshot.version, name, lambda: columns_frame(table_columns([tables[index]])[0]))
+
+# Define callback sending only the visible rows of a DataTable after paging, sorting or filtering
+@app.callback(
+    [
+        dash.dependencies.Output({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'data'),
+        dash.dependencies.Output({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'page_count')
+    ],
+    [
+        dash.dependencies.Input({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'page_current'),
+        dash.dependencies.Input({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'page_size'),
+        dash.dependencies.Input({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'sort_by'),
+        dash.dependencies.Input({'type': 'data-table', 'index': dash.dependencies.MATCH}, 'filter_query')
+    ],
+    prevent_initial_call=True
+)
+def update_data_table_page(page_current, page_size, sort_by, filter_query):
+    frame = get_table_frame(load_snapshot(), dash.callback_context.triggered_id['index'])
+    if frame is None:
+        return dash.no_update, dash.no_update
     
-    # Last updated
-    try:
-        last_updated = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        last_updated_div = html.P(f"Laatst bijgewerkt: {last_updated}", className="last-updated")
-    except:
-        last_updated_div = html.P("Laatst bijgewerkt: onbekend", className="last-updated")
+    records, page_count = query_page(frame, page_current, page_size, sort_by, filter_query)
+    return records, page_count
+
+@app.callback(
+    dash.dependencies.Output('tables-section', 'children'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_tables_section(version):
+    return get_section(version, 'tables-section', build_tables_section)
+
+@app.callback(
+    dash.dependencies.Output('last-updated', 'children'),
+    [dash.dependencies.Input('sections-request', 'data')]
+)
+def update_last_updated(version):
+    return get_section(version, 'last-updated', build_last_updated)
+
+# Dutch labels of the kinds of search hits
+SEARCH_KIND_LABELS = {'heading': "Kop", 'paragraph': "Alinea", 'list_item': "Opsomming"}
+
+# Function to render search hits with the matched words highlighted
+def create_search_results(total, hits):
+    """Create the result list of a search, each hit linked to its heading in the Voorjaarsnota"""
+    if not total:
+        return html.P("Geen resultaten gevonden.", className="search-count")
+    
+    count = f"{total} resultaten" if total != 1 else "1 resultaat"
+    if total > len(hits):
+        count += f", de beste {len(hits)} worden getoond"
+    
+    items = []
+    for hit in hits:
+        title = hit.heading or "Voorjaarsnota 2024"
+        items.append(html.Div([
+            html.A(title, href=hit.url, target="_blank") if hit.url else html.Span(title),
+            html.Span(SEARCH_KIND_LABELS[hit.kind], className="search-kind"),
+            html.P([html.Mark(text) if is_hit else text for text, is_hit in highlight(hit.text, hit.spans)])
+        ], className="search-hit"))
+    return [html.P(count, className="search-count")] + items
+
+# Define callback answering a search from the index of the current snapshot
+@app.callback(
+    dash.dependencies.Output('search-results', 'children'),
+    [dash.dependencies.Input('search-input', 'value')],
+    prevent_initial_call=True
+)
+def update_search_results(query):
+    if not query or not query.strip():
+        return []
     
-    return financial_chart, financial_pie_chart, topics_chart, statistics_items, financial_table, mindmap, tables_section, last_updated_div
+    total, hits = get_search_index(load_snapshot()).search(query, SEARCH_LIMIT)
+    return create_search_results(total, hits)
+
+# Function to build everything the dashboard serves for the current snapshot
+@timed()
+def warm_up():
+    """Build all sections, table bodies, table frames, the heading tree and the search index, then mark the process ready
+
+    Unlike load_snapshot() this never starts a background refresh, so it is
+    safe in a gunicorn master that forks its workers afterwards.
+    """
+    snapshot = snapshots.get()
+    if snapshot is None:
+        # No snapshot yet: the first scrape (or the sample data) is synchronous
+        snapshot = load_snapshot()
+    
+    build_dashboard(snapshot)
+    get_heading_tree(snapshot)
+    get_search_index(snapshot)
+    get_table_frame(snapshot, 'financial')
+    for index in range(len(snapshot.data['tables'])):
+        get_table_body(snapshot, index)
+        get_table_frame(snapshot, f"table-{index}")
+    
+    warm_up_done.set()
+    print(f"Warmed up snapshot {snapshot.version}")
+
+# Set once warm_up() has finished in this process (or, with a preloading master, before the fork)
+warm_up_done = threading.Event()
+_warm_up_started = threading.Lock()
+
+# Function to start the warm-up in the background, at most once per process
+def start_warm_up():
+    if _warm_up_started.acquire(blocking=False):
+        threading.Thread(target=warm_up, daemon=True).start()
+
+# Readiness endpoint for load balancers: 503 until the caches are warm
+@app.server.route(f"{app.config.routes_pathname_prefix}api/ready")
+def readiness_endpoint():
+    if not warm_up_done.is_set():
+        # Without a warm-up at startup, the first probe starts one
+        start_warm_up()
+        return flask.jsonify(ready=False), 503
+    return flask.jsonify(ready=True, version=load_snapshot().version)
 
 # Run the app
 if __name__ == '__main__':
@@ -1827,3 +2160,8 @@ if __name__ == '__main__':
 else:
     # For production deployment
     server = app.server
+    
+    # gunicorn.conf.py asks for the warm-up at import; with preload_app that happens once in the master before forking
+    if DASHBOARD_WARMUP:
+        _warm_up_started.acquire()
+        warm_up()
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+# Where a financial item was found, in the order of their codes
+SOURCES = ('table', 'text', 'numeric_data')
+
+
+class FactBuilder:
+    """Collects financial items one at a time and turns them into a FinancialFacts store"""
+
+    def __init__(self):
+        self.categories = []
+        self.amounts = []
+        self.sources = []
+        self.texts = []
+
+    def append(self, category, amount, original_text, source):
+        """Add one item; source must be one of SOURCES"""
+        self.categories.append(category)
+        self.amounts.append(amount)
+        self.sources.append(SOURCES.index(source))
+        self.texts.append(original_text)
+
+    def build(self):
+        """Return the items collected so far as a FinancialFacts store"""
+        categorical = pd.Categorical(self.categories)
+        ends = np.cumsum([len(text) for text in self.texts], dtype=np.int64)
+        return FinancialFacts(
+            categories=list(categorical.categories),
+            category_codes=categorical.codes,
+            amounts=self.amounts,
+            sources=self.sources,
+            text=''.join(self.texts),
+            ends=ends
+        )
+
+
+class FinancialFacts:
+    """Columnar store of the extracted financial items
+
+    Every item is a row of four columns: a code into the sorted list of
+    categories, its amount (float64), a code into SOURCES and the span of its
+    original text in one shared text buffer. Totals and counts per category
+    and per source are computed once, and rollup() aggregates any subset of
+    the rows with a single bincount.
+    """
+
+    def __init__(self, categories, category_codes, amounts, sources, text, ends):
+        self.categories = np.array(categories, dtype=object)
+        self.category_codes = np.asarray(category_codes, dtype=np.int32)
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.sources = np.asarray(sources, dtype=np.int8)
+        self.text = text
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.starts = np.concatenate([[0], self.ends]).astype(np.int64)[:-1]
+
+        # Precomputed rollups
+        self.category_totals = np.bincount(self.category_codes, weights=self.amounts, minlength=len(self.categories))
+        self.category_counts = np.bincount(self.category_codes, minlength=len(self.categories))
+        self.source_totals = np.bincount(self.sources, weights=self.amounts, minlength=len(SOURCES))
+        self.source_counts = np.bincount(self.sources, minlength=len(SOURCES))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a store from to_dict() output"""
+        return cls(**data)
+
+    def to_dict(self):
+        """Return the columns as plain lists, for the JSON artifact cache"""
+        return {
+            'categories': self.categories.tolist(),
+            'category_codes': self.category_codes.tolist(),
+            'amounts': self.amounts.tolist(),
+            'sources': self.sources.tolist(),
+            'text': self.text,
+            'ends': self.ends.tolist()
+        }
+
+    def original_texts(self, rows=None):
+        """Return the original text of every row (or of the given row positions)"""
+        rows = range(len(self)) if rows is None else rows
+        return [self.text[self.starts[row]:self.ends[row]] for row in rows]
+
+    def mask(self, min_amount=None, max_amount=None, categories=None, sources=None):
+        """Return a boolean array selecting the rows within the amount bounds and in the given categories and sources"""
+        mask = np.ones(len(self), dtype=bool)
+        if min_amount is not None:
+            mask &= self.amounts >= min_amount
+        if max_amount is not None:
+            mask &= self.amounts <= max_amount
+        if categories is not None:
+            mask &= np.isin(self.category_codes, np.flatnonzero(np.isin(self.categories, list(categories))))
+        if sources is not None:
+            mask &= np.isin(self.sources, [SOURCES.index(source) for source in sources])
+        return mask
+
+    def rollup(self, mask=None):
+        """Return a DataFrame with the total amount and item count per category, sorted by category
+
+        Without a mask the precomputed totals are used; categories without
+        selected items are left out.
+        """
+        if mask is None:
+            totals, counts = self.category_totals, self.category_counts
+        else:
+            totals = np.bincount(self.category_codes[mask], weights=self.amounts[mask], minlength=len(self.categories))
+            counts = np.bincount(self.category_codes[mask], minlength=len(self.categories))
+        present = counts > 0
+        return pd.DataFrame({
+            'category': self.categories[present],
+            'amount': totals[present],
+            'count': counts[present]
+        })
+
+    def to_frame(self):
+        """Return the rows as a DataFrame with the category, amount, original text and source of every item"""
+        return pd.DataFrame({
+            'category': self.categories[self.category_codes],
+            'amount': self.amounts,
+            'original_text': self.original_texts(),
+            'source': np.array(SOURCES, dtype=object)[self.sources]
+        })
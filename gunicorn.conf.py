@@ -0,0 +1,15 @@
+import gc
+import os
+
+# Import the app once in the master and fork the workers from it, so they share its warm caches copy-on-write
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Let dashboard.py load the snapshot, process it and build every figure while it is imported
+os.environ.setdefault('DASHBOARD_WARMUP', '1')
+
+
+# Called in the master after the app is loaded and before any worker is forked
+def when_ready(server):
+    if preload_app:
+        # Move the warmed-up objects out of the collector's reach, so collections in the workers do not copy their pages
+        gc.freeze()
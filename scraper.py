@@ -0,0 +1,668 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from snapshot import SNAPSHOT_PATH, atomic_write, read_snapshot_file, snapshot_bytes
+from tables import MAX_COLSPAN, MAX_ROWSPAN, grid_table, parse_span, type_tables
+from telemetry import timed
+
+# File locks are only available on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# URL to scrape (can be overridden, e.g. to point at a local test server)
+URL = os.environ.get(
+    'SCRAPE_URL',
+    "https://abx10.archiefweb.eu:8443/watdoetdegemeentevoorjaarsnota2024/20241114091054mp_/https://archieven.watdoetdegemeente.rotterdam.nl/voorjaarsnota2024/hoofdlijnen/01-voortgang/"
+)
+
+# Headers sent with every request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36'
+}
+
+# Seconds a snapshot is considered fresh before it is revalidated
+SCRAPE_TTL = int(os.environ.get('SCRAPE_TTL', '3600'))
+
+# Seconds to wait before retrying after a failed refresh
+RETRY_INTERVAL = int(os.environ.get('SCRAPE_RETRY_INTERVAL', '300'))
+
+# Connect and read timeouts for requests to the website
+TIMEOUT = (5, 30)
+
+# Scrape only URL ('page') or every page of the Voorjaarsnota under CRAWL_ROOT ('crawl')
+SCRAPE_MODE = os.environ.get('SCRAPE_MODE', 'page')
+
+# Pages under this prefix belong to the Voorjaarsnota and are crawled (unset: derived from the start URL by crawl_root())
+CRAWL_ROOT = os.environ.get('CRAWL_ROOT')
+
+# Crawler limits: pages per crawl, worker threads, concurrent requests per host and retries
+CRAWL_MAX_PAGES = int(os.environ.get('CRAWL_MAX_PAGES', '500'))
+CRAWL_WORKERS = int(os.environ.get('CRAWL_WORKERS', '8'))
+CRAWL_PER_HOST = int(os.environ.get('CRAWL_PER_HOST', '4'))
+CRAWL_RETRIES = int(os.environ.get('CRAWL_RETRIES', '3'))
+
+# Links to files that are never HTML pages
+SKIPPED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.css', '.js', '.zip', '.xlsx', '.docx')
+
+# Validators (ETag / Last-Modified) of the last fetch, stored next to the snapshot
+META_PATH = os.path.splitext(SNAPSHOT_PATH)[0] + '.meta.json'
+
+# Lock file making sure only one process scrapes at a time
+LOCK_PATH = os.path.splitext(SNAPSHOT_PATH)[0] + '.lock'
+
+
+# Function to fetch a page, sending validators from an earlier fetch
+@timed('fetch')
+def fetch_page(url=URL, etag=None, last_modified=None, session=None):
+    """Return the response of a conditional GET; status 304 means the page is unchanged"""
+    headers = dict(HEADERS)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    response = (session or requests).get(url, headers=headers, timeout=TIMEOUT)
+    if response.status_code != 304:
+        response.raise_for_status()
+    return response
+
+
+# Elements whose text BeautifulSoup leaves out of the text of their parents
+SKIPPED_TAGS = {'script', 'style', 'template'}
+
+# Heading elements, collected in document order
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Whitespace following a leading doctype declaration
+DOCTYPE_WHITESPACE = re.compile(r'\s*<!doctype[^>]*>(\s+)', re.IGNORECASE)
+
+
+class PageExtractor:
+    """lxml parser target collecting every snapshot field in a single pass
+
+    The parser streams start/end/data events to this object, so no tree is
+    built. All text goes into one list of chunks; an element only records the
+    chunk index where it starts and joins the chunks up to its end tag. Items
+    are given their slot when their start tag is seen, so nested elements come
+    out in document order exactly like BeautifulSoup's find_all().
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.title = None
+        self.headings = []
+        self.paragraphs = []
+        self.list_items = []
+        self.tables = []
+        self.images = []
+        self.links = []
+        # Stack of (tag, output list, slot index, first chunk index) for open collected elements
+        self._open = []
+        # Open tables and rows; nested tables also add their rows and cells to the outer ones
+        self._open_tables = []
+        self._open_rows = []
+        # Cell layout of every table (rows of [text], rowspan, colspan, is_header), without nested tables
+        self.layouts = []
+        self._open_layouts = []
+        self._skip_depth = 0
+
+    def start(self, tag, attrib):
+        # Elements inside skipped ones are still found, they just have no text
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+        if tag in HEADING_TAGS:
+            self._collect(tag, self.headings)
+        elif tag == 'p':
+            self._collect(tag, self.paragraphs)
+        elif tag == 'li':
+            self._collect(tag, self.list_items)
+        elif tag == 'title':
+            if self.title is None:
+                self._collect(tag, None)
+        elif tag == 'table':
+            table = {'headers': [], 'rows': []}
+            self.tables.append(table)
+            self._open_tables.append(table)
+            self.layouts.append([])
+            self._open_layouts.append(self.layouts[-1])
+        elif tag == 'tr':
+            row = []
+            for table in self._open_tables:
+                table['rows'].append(row)
+            self._open_rows.append(row)
+            if self._open_layouts:
+                self._open_layouts[-1].append([])
+        elif tag in ('th', 'td'):
+            # The cell text also goes to a holder referenced from the layout of the innermost table
+            holder = []
+            if tag == 'th':
+                self._collect(tag, [table['headers'] for table in self._open_tables] + [holder])
+            else:
+                self._collect(tag, list(self._open_rows) + [holder])
+            if self._open_layouts:
+                layout = self._open_layouts[-1]
+                if not layout:
+                    layout.append([])
+                layout[-1].append((
+                    holder,
+                    parse_span(attrib.get('rowspan'), MAX_ROWSPAN),
+                    parse_span(attrib.get('colspan'), MAX_COLSPAN),
+                    tag == 'th'
+                ))
+        elif tag == 'a':
+            if 'href' in attrib:
+                self.links.append(attrib['href'])
+        elif tag == 'img':
+            self.images.append({
+                'src': attrib.get('src', ''),
+                'alt': attrib.get('alt', ''),
+                'width': attrib.get('width', ''),
+                'height': attrib.get('height', '')
+            })
+
+    def _collect(self, tag, targets):
+        # Reserve the slot now so that nested elements keep document order
+        if targets is None:
+            slots = []
+        elif tag in ('th', 'td'):
+            slots = [(target, len(target)) for target in targets]
+            for target in targets:
+                target.append(None)
+        else:
+            slots = [(targets, len(targets))]
+            targets.append(None)
+        self._open.append((tag, slots, len(self.chunks)))
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth -= 1
+
+        if tag == 'table':
+            if self._open_tables:
+                self._open_tables.pop()
+                self._open_layouts.pop()
+            return
+        if tag == 'tr':
+            if self._open_rows:
+                self._open_rows.pop()
+            return
+
+        if self._open and self._open[-1][0] == tag:
+            _, slots, first_chunk = self._open.pop()
+            text = ''.join(self.chunks[first_chunk:])
+            if tag == 'title':
+                self.title = text
+                return
+            text = text.strip()
+            if tag in HEADING_TAGS:
+                slots[0][0][slots[0][1]] = {'level': int(tag[1]), 'text': text}
+            else:
+                for target, index in slots:
+                    target[index] = text
+
+    def data(self, text):
+        if not self._skip_depth:
+            self.chunks.append(text)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        # Elements still open at the end of the document own all remaining text
+        while self._open:
+            self.end(self._open[-1][0])
+        for table in self.tables:
+            table['rows'] = [row for row in table['rows'] if row]
+        return self
+
+    def table_layouts(self):
+        """Return the layout of every table with the cell texts filled in"""
+        return [
+            [[(holder[0], rowspan, colspan, is_header) for holder, rowspan, colspan, is_header in row] for row in layout]
+            for layout in self.layouts
+        ]
+
+
+# Function to extract the dashboard data from a page
+@timed('parse')
+def parse_page(html, links=None):
+    """Parse the HTML of a page into the snapshot structure in a single lxml pass
+
+    If a list is passed as links, the href of every anchor is appended to it.
+    """
+    extractor = PageExtractor()
+    parser = etree.HTMLParser(target=extractor)
+    parser.feed(html)
+    parser.close()
+    if links is not None:
+        links.extend(extractor.links)
+
+    # libxml2 drops the whitespace between the doctype and <html>; BeautifulSoup keeps it
+    leading = DOCTYPE_WHITESPACE.match(html)
+    text = (leading.group(1) if leading else '') + ''.join(extractor.chunks)
+
+    # Resolve rowspan/colspan and type the columns now, so the dashboard never parses table cells
+    grids = [grid_table(layout) for layout in extractor.table_layouts()]
+    for table, columns in zip(extractor.tables, type_tables(grids)):
+        table['columns'] = columns
+
+    return {
+        'page_title': extractor.title if extractor.title is not None else "Voorjaarsnota 2024 Dashboard",
+        'headings': extractor.headings,
+        'paragraphs': [p for p in extractor.paragraphs if p],
+        'list_items': [li for li in extractor.list_items if li],
+        'tables': extractor.tables,
+        'numeric_data': re.findall(r'\d+[.,]?\d*\s?(%|miljoen|duizend|euro|€)', text),
+        'images': extractor.images,
+        'full_text': text,
+        'last_updated': datetime.datetime.now().isoformat()
+    }
+
+
+# Reference implementation of parse_page on BeautifulSoup (used for comparisons and benchmarks)
+def parse_page_soup(html):
+    """Parse the HTML of a page into the snapshot structure with BeautifulSoup"""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Extract page title
+    page_title = soup.title.text if soup.title else "Voorjaarsnota 2024 Dashboard"
+
+    # Extract headings
+    headings = []
+    for tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        for heading in soup.find_all(tag):
+            headings.append({
+                'level': int(tag[1]),
+                'text': heading.text.strip()
+            })
+
+    # Extract paragraphs
+    paragraphs = [p.text.strip() for p in soup.find_all('p') if p.text.strip()]
+
+    # Extract list items
+    list_items = [li.text.strip() for li in soup.find_all('li') if li.text.strip()]
+
+    # Extract tables
+    tables = []
+    for table in soup.find_all('table'):
+        headers = [th.text.strip() for th in table.find_all('th')]
+        rows = []
+        for tr in table.find_all('tr'):
+            row = [td.text.strip() for td in tr.find_all('td')]
+            if row:
+                rows.append(row)
+        tables.append({'headers': headers, 'rows': rows})
+
+    # Extract numeric data (percentages, amounts, etc.)
+    text = soup.get_text()
+    numeric_data = re.findall(r'\d+[.,]?\d*\s?(%|miljoen|duizend|euro|€)', text)
+
+    # Extract images
+    images = []
+    for img in soup.find_all('img'):
+        images.append({
+            'src': img.get('src', ''),
+            'alt': img.get('alt', ''),
+            'width': img.get('width', ''),
+            'height': img.get('height', '')
+        })
+
+    # Create structured data
+    return {
+        'page_title': page_title,
+        'headings': headings,
+        'paragraphs': paragraphs,
+        'list_items': list_items,
+        'tables': tables,
+        'numeric_data': numeric_data,
+        'images': images,
+        'full_text': text,
+        'last_updated': datetime.datetime.now().isoformat()
+    }
+
+
+# Function to create a pooled session that retries failed requests
+def make_session(pool_size=CRAWL_WORKERS, retries=CRAWL_RETRIES):
+    """Return a requests.Session keeping connections open and retrying with backoff"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',)
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Helper function to find the folder a crawl stays in
+def crawl_root(start_url):
+    """Return CRAWL_ROOT if it is set, else the voorjaarsnota2024/ folder of start_url, else the directory of start_url"""
+    if CRAWL_ROOT:
+        return CRAWL_ROOT
+    marker = 'voorjaarsnota2024/'
+    position = start_url.rfind(marker)
+    if position != -1:
+        return start_url[:position + len(marker)]
+    return urljoin(start_url, './')
+
+
+# Helper function to turn a link into a crawlable page URL, or None if it is out of scope
+def crawl_url(base_url, href, root=None):
+    root = root or crawl_root(URL)
+    url = urldefrag(urljoin(base_url, href.strip()))[0]
+    if not url.startswith(root) or url.lower().endswith(SKIPPED_EXTENSIONS):
+        return None
+    return url
+
+
+# Function to combine the snapshots of several pages into one
+def merge_pages(pages):
+    """Merge page snapshots in order, recording which items came from which page"""
+    merged = {
+        'page_title': pages[0]['data']['page_title'] if pages else "Voorjaarsnota 2024 Dashboard",
+        'headings': [],
+        'paragraphs': [],
+        'list_items': [],
+        'tables': [],
+        'numeric_data': [],
+        'images': [],
+        'full_text': '',
+        'last_updated': datetime.datetime.now().isoformat(),
+        'pages': []
+    }
+    texts = []
+    text_offset = 0
+    for page in pages:
+        data = page['data']
+        # Provenance: the [start, end) range each page occupies in the merged lists
+        provenance = {'url': page['url'], 'title': data['page_title'], 'fetched_at': page['fetched_at']}
+        for key in ('headings', 'paragraphs', 'list_items', 'tables', 'numeric_data', 'images'):
+            provenance[key] = [len(merged[key]), len(merged[key]) + len(data[key])]
+            merged[key].extend(data[key])
+        provenance['full_text'] = [text_offset, text_offset + len(data['full_text'])]
+        texts.append(data['full_text'])
+        text_offset += len(data['full_text']) + 1
+        merged['pages'].append(provenance)
+    merged['full_text'] = '\n'.join(texts)
+    return merged
+
+
+# Function to crawl every page of the Voorjaarsnota
+def crawl_site(start_url=URL, root=None, max_pages=CRAWL_MAX_PAGES, workers=CRAWL_WORKERS, per_host=CRAWL_PER_HOST, session=None):
+    """Fetch all pages under root reachable from start_url and merge them into one snapshot
+
+    Pages are fetched concurrently on a bounded thread pool sharing one
+    pooled session, with at most per_host requests in flight per host.
+    The merged snapshot lists pages in discovery order. A page that cannot
+    be fetched or parsed is logged and left out; only the start page is
+    required.
+    """
+    root = root or crawl_root(start_url)
+    session = session or make_session(workers)
+    host_limits = {}
+    host_limits_lock = threading.Lock()
+
+    def fetch(url):
+        host = urlsplit(url).netloc
+        with host_limits_lock:
+            limit = host_limits.setdefault(host, threading.BoundedSemaphore(per_host))
+        with limit:
+            response = fetch_page(url, session=session)
+        fetched_at = datetime.datetime.now().isoformat()
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return None, []
+        links = []
+        data = parse_page(response.text, links)
+        return {'url': url, 'data': data, 'fetched_at': fetched_at}, links
+
+    seen = {start_url: 0}
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(fetch, start_url): start_url}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    page, links = future.result()
+                except Exception as e:
+                    # One broken page must not cost the whole crawl
+                    print(f"Error crawling {url}: {e!r}")
+                    continue
+                if page is None:
+                    continue
+                results[url] = page
+                for href in links:
+                    link = crawl_url(url, href, root)
+                    if link is None or link in seen or len(seen) >= max_pages:
+                        continue
+                    seen[link] = len(seen)
+                    pending[executor.submit(fetch, link)] = link
+
+    if start_url not in results:
+        raise requests.RequestException(f"Could not crawl start page {start_url}")
+    return merge_pages(sorted(results.values(), key=lambda page: seen[page['url']]))
+
+
+# Helper functions to read and write the fetch validators
+def read_meta(path=META_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_meta(meta, path=META_PATH):
+    atomic_write(path, json.dumps(meta))
+
+
+# Function to fingerprint what a scrape found, leaving out when it was scraped
+def content_digest(data):
+    """Return a hash of the snapshot data without last_updated and the fetch times of crawled pages
+
+    Two scrapes of an unchanged page give the same digest, so the snapshot
+    (and with it the version every cache is keyed by) can be left alone.
+    """
+    content = {key: value for key, value in data.items() if key != 'last_updated'}
+    if 'pages' in content:
+        content['pages'] = [{key: value for key, value in page.items() if key != 'fetched_at'} for page in content['pages']]
+    return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, shared by all processes on this machine"""
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False return False instead of waiting for it"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class Refresher:
+    """Keeps the snapshot file fresh with a TTL and stale-while-revalidate
+
+    A stale snapshot keeps being served while a background thread
+    revalidates it with a conditional GET. An unchanged page costs a 304
+    and only bumps the check time in the meta file; so does a 200 whose
+    content has the same digest as the snapshot (servers without
+    validators). A file lock makes the
+    refresh single-flight across gunicorn workers, and the snapshot is
+    replaced with an atomic rename so readers never see a partial file.
+    """
+
+    def __init__(self, url=URL, path=SNAPSHOT_PATH, meta_path=META_PATH, lock_path=LOCK_PATH, ttl=SCRAPE_TTL, retry_interval=RETRY_INTERVAL, mode=SCRAPE_MODE):
+        self.url = url
+        self.mode = mode
+        self.path = path
+        self.meta_path = meta_path
+        self.lock_path = lock_path
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._last_failure = None
+
+    def checked_at(self):
+        """Return the time the snapshot was last fetched or revalidated, or None"""
+        # The meta file is rewritten on every check; fall back to the snapshot itself
+        for path in (self.meta_path, self.path):
+            try:
+                return os.stat(path).st_mtime
+            except OSError:
+                continue
+        return None
+
+    def is_stale(self):
+        """Return True if the snapshot is missing or older than the TTL"""
+        checked_at = self.checked_at()
+        return checked_at is None or time.time() - checked_at >= self.ttl
+
+    def refresh(self):
+        """Revalidate the snapshot now; return True if the file was rewritten
+
+        If another process is already scraping, wait for it and use its
+        result instead of fetching the page a second time.
+        """
+        checked_at = self.checked_at()
+        with self._lock, FileLock(self.lock_path):
+            # Another process refreshed the snapshot while we waited for the lock
+            if os.path.exists(self.path) and (self.checked_at() != checked_at or not self.is_stale()):
+                return False
+            return self._refresh()
+
+    @timed('scrape')
+    def _refresh(self):
+        if self.mode == 'crawl':
+            return self._crawl()
+
+        meta = read_meta(self.meta_path) if os.path.exists(self.path) else {}
+        response = fetch_page(self.url, meta.get('etag'), meta.get('last_modified'))
+
+        changed = False
+        if response.status_code != 304:
+            data = parse_page(response.text)
+            digest = content_digest(data)
+            changed = self._write_if_changed(data, digest, meta)
+            meta = {
+                'url': self.url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_digest': digest
+            }
+
+        meta['checked_at'] = datetime.datetime.now().isoformat()
+        write_meta(meta, self.meta_path)
+        return changed
+
+    def _crawl(self):
+        # The pages are not revalidated one by one; an unchanged crawl still leaves the snapshot alone
+        meta = read_meta(self.meta_path) if os.path.exists(self.path) else {}
+        data = crawl_site(self.url)
+        digest = content_digest(data)
+        changed = self._write_if_changed(data, digest, meta)
+        write_meta({
+            'url': self.url,
+            'mode': 'crawl',
+            'content_digest': digest,
+            'checked_at': datetime.datetime.now().isoformat()
+        }, self.meta_path)
+        return changed
+
+    def _write_if_changed(self, data, digest, meta):
+        # Rewriting identical content would only give it a new last_updated and a new version
+        if os.path.exists(self.path) and meta.get('content_digest') == digest:
+            return False
+        atomic_write(self.path, snapshot_bytes(data, self.path))
+        return True
+
+    def refresh_in_background(self):
+        """Start a background refresh unless one is running or the last one failed recently"""
+        if self._last_failure is not None and time.time() - self._last_failure < self.retry_interval:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(target=self._background_refresh, daemon=True)
+        thread.start()
+        return True
+
+    def _background_refresh(self):
+        file_lock = FileLock(self.lock_path)
+        try:
+            # Another worker is already refreshing: keep serving the previous snapshot
+            if not file_lock.acquire(blocking=False):
+                return
+            try:
+                # It may also have finished just before we got the lock
+                if self.is_stale():
+                    self._refresh()
+            finally:
+                file_lock.release()
+            self._last_failure = None
+        except Exception as e:
+            self._last_failure = time.time()
+            print(f"Error refreshing data: {e}")
+        finally:
+            self._lock.release()
+
+
+# Default refresher for the snapshot file
+refresher = Refresher()
+
+
+# Run a refresh from the command line, e.g. as a nightly job
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape the Voorjaarsnota into the snapshot file")
+    parser.add_argument('--crawl', action='store_true', help="crawl every page under CRAWL_ROOT")
+    parser.add_argument('--url', default=URL, help="page to scrape or start crawling from")
+    args = parser.parse_args()
+
+    refresher = Refresher(url=args.url, ttl=0, mode='crawl' if args.crawl else SCRAPE_MODE)
+    refresher.refresh()
+    data = read_snapshot_file(refresher.path)
+    print(f"Scraped {len(data.get('pages', [None]))} page(s) into {refresher.path}")
@@ -0,0 +1,312 @@
+import math
+import re
+import unicodedata
+from collections import namedtuple
+from urllib.parse import quote
+
+import numpy as np
+
+from telemetry import timed
+
+# Words and numbers, keeping a Dutch apostrophe ending such as "programma's" or "auto's" with its word
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)?")
+
+# A phrase between double quotes in a query
+PHRASE_PATTERN = re.compile(r'"([^"]*)"?')
+
+# Vowels for the stemmer (after diacritics are removed)
+VOWELS = frozenset('aeiouy')
+
+# BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Number of hits a search returns by default
+SEARCH_LIMIT = 10
+
+# Characters of a document shown around its first hit
+SNIPPET_WIDTH = 240
+
+# Kinds of documents in the index, in the order they are numbered
+DOCUMENT_KINDS = ('heading', 'paragraph', 'list_item')
+
+# One ranked search result; spans are the (start, end) character ranges of matched words in text
+SearchHit = namedtuple('SearchHit', ['kind', 'item', 'score', 'text', 'heading', 'url', 'spans'])
+
+
+# Function to reduce a Dutch word to the form stored in the index
+def normalize(word):
+    """Return the lowercased word without diacritics or apostrophe ending, lightly stemmed
+
+    The stemmer only strips common inflections (plural -en and -s,
+    adjective -e, -heden to -heid) and then evens out spelling changes
+    (double consonants, double vowels), so "bedragen" finds "bedrag",
+    "financiële" finds "financieel" and "jaren" finds "jaar".
+    """
+    word = unicodedata.normalize('NFKD', word.lower())
+    word = ''.join(char for char in word if not unicodedata.combining(char))
+    word = re.split(r"['’]", word, maxsplit=1)[0]
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    if word.endswith('heden'):
+        word = word[:-5] + 'heid'
+    elif word.endswith('en') and len(word) >= 5 and word[-3] not in VOWELS:
+        word = word[:-2]
+    elif word.endswith('e') and len(word) >= 5 and word[-2] not in VOWELS:
+        word = word[:-1]
+    elif word.endswith('s') and len(word) >= 5 and word[-2] not in VOWELS and word[-2] not in 'js':
+        word = word[:-1]
+
+    # "plann" -> "plan", "financieel" -> "financiel", so both spellings meet
+    if len(word) >= 4 and word[-1] == word[-2] and word[-1] not in VOWELS:
+        word = word[:-1]
+    elif len(word) >= 4 and word[-1] not in VOWELS and word[-2] == word[-3] and word[-2] in 'aeou':
+        word = word[:-2] + word[-1]
+    return word
+
+
+# Function to split a text into index terms
+def tokenize(text):
+    """Return (term, start, end) for every word of text, with the character range it occupies"""
+    return [(normalize(match.group()), match.start(), match.end()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+# Function to split a query into phrases and loose words
+def parse_query(query):
+    """Return (phrases, words): the term lists of quoted phrases and the terms outside quotes"""
+    phrases = []
+    for match in PHRASE_PATTERN.finditer(query):
+        terms = [term for term, _, _ in tokenize(match.group(1))]
+        if terms:
+            phrases.append(terms)
+    words = [term for term, _, _ in tokenize(PHRASE_PATTERN.sub(' ', query))]
+    return phrases, words
+
+
+# Helper function to find the byte offset in the full text where every string of a list starts
+def _text_offsets(corpus, strings):
+    # Strings follow the page order, so each one is looked for after the previous one first
+    offsets = []
+    cursor = 0
+    for string in strings:
+        position = corpus.find(string, 'full_text', cursor) if string else -1
+        if position == -1 and string:
+            position = corpus.find(string, 'full_text')
+        if position != -1:
+            cursor = position
+        offsets.append(position)
+    return np.array(offsets, dtype=np.int64)
+
+
+# Helper function to find the page of every item of a kind in a merged crawl snapshot
+def _item_pages(pages, key, count):
+    item_pages = np.full(count, -1, dtype=np.int32)
+    for page_index, page in enumerate(pages or []):
+        start, end = page[key]
+        item_pages[start:end] = page_index
+    return item_pages
+
+
+class SearchIndex:
+    """Inverted index over the headings, paragraphs and list items of a snapshot
+
+    Postings are stored like a sparse matrix: the postings of term t are
+    doc_ids[term_ptr[t]:term_ptr[t + 1]] (sorted) with their term_freqs, and
+    the word positions of posting p are positions[pos_ptr[p]:pos_ptr[p + 1]].
+    Documents are numbered headings first, then paragraphs, then list items;
+    their text is read back from the corpus only to highlight a hit.
+    """
+
+    def __init__(self, corpus, headings, pages=None, url=None):
+        self.corpus = corpus
+        self.headings = [heading['text'] for heading in headings]
+        self.urls = [page['url'] for page in pages] if pages else [url]
+
+        paragraphs = corpus.strings('paragraphs')
+        list_items = corpus.strings('list_items')
+        counts = (len(self.headings), len(paragraphs), len(list_items))
+        self.doc_kinds = np.repeat(np.arange(len(DOCUMENT_KINDS), dtype=np.int8), counts)
+        self.doc_items = np.concatenate([np.arange(count, dtype=np.int32) for count in counts])
+
+        # Every word occurrence as (term id, document, position), sorted into postings below
+        self.terms = {}
+        term_ids, docs, positions, lengths = [], [], [], []
+        for doc, text in enumerate(self._texts(paragraphs, list_items)):
+            terms = [term for term, _, _ in tokenize(text)]
+            term_ids.extend(self.terms.setdefault(term, len(self.terms)) for term in terms)
+            docs.extend([doc] * len(terms))
+            positions.extend(range(len(terms)))
+            lengths.append(len(terms))
+        term_ids = np.array(term_ids, dtype=np.int32)
+        docs = np.array(docs, dtype=np.int32)
+        positions = np.array(positions, dtype=np.int32)
+
+        order = np.lexsort((positions, docs, term_ids))
+        term_ids, docs, self.positions = term_ids[order], docs[order], positions[order]
+        boundaries = np.ones(len(docs), dtype=bool)
+        boundaries[1:] = (term_ids[1:] != term_ids[:-1]) | (docs[1:] != docs[:-1])
+        starts = np.flatnonzero(boundaries)
+        self.doc_ids = docs[starts]
+        self.pos_ptr = np.append(starts, len(docs))
+        self.term_freqs = np.diff(self.pos_ptr).astype(np.int32)
+        self.term_ptr = np.searchsorted(term_ids[starts], np.arange(len(self.terms) + 1))
+
+        # BM25 length normalization per document, so a query only adds up precomputed parts
+        self.doc_lengths = np.array(lengths, dtype=np.float64)
+        average_length = self.doc_lengths.mean() if len(lengths) else 0.0
+        self.doc_norms = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / (average_length or 1.0))
+
+        self._link_headings(counts, pages)
+
+    def _texts(self, paragraphs, list_items):
+        yield from self.headings
+        yield from paragraphs
+        yield from list_items
+
+    def _link_headings(self, counts, pages):
+        # The heading of a paragraph or list item is the last heading before it in the full text,
+        # searched as bytes in the shared buffer so the full text is never decoded
+        offsets = np.concatenate([
+            _text_offsets(self.corpus, self.headings),
+            _text_offsets(self.corpus, self.corpus.strings('paragraphs')),
+            _text_offsets(self.corpus, self.corpus.strings('list_items'))
+        ])
+        self.doc_pages = np.concatenate([
+            _item_pages(pages, key, count) for key, count in zip(('headings', 'paragraphs', 'list_items'), counts)
+        ])
+
+        heading_docs = np.flatnonzero(offsets[:counts[0]] >= 0)
+        heading_docs = heading_docs[np.argsort(offsets[heading_docs], kind='stable')]
+        preceding = np.searchsorted(offsets[heading_docs], offsets, side='right') - 1
+        self.doc_headings = np.where((offsets >= 0) & (preceding >= 0), heading_docs[np.maximum(preceding, 0)], -1).astype(np.int32)
+        self.doc_headings[:counts[0]] = np.arange(counts[0])
+
+        # A heading on another page cannot be linked to from this one
+        linked = self.doc_headings >= 0
+        other_page = linked & (self.doc_pages[np.maximum(self.doc_headings, 0)] != self.doc_pages)
+        self.doc_headings[other_page] = -1
+
+    def __len__(self):
+        return len(self.doc_kinds)
+
+    def _postings(self, term):
+        term_id = self.terms.get(term)
+        if term_id is None:
+            return None
+        return slice(self.term_ptr[term_id], self.term_ptr[term_id + 1])
+
+    def _phrase_docs(self, phrase):
+        """Return the documents containing the terms of phrase next to each other, in order"""
+        postings = [self._postings(term) for term in phrase]
+        if any(posting is None for posting in postings):
+            return np.array([], dtype=np.int32)
+        docs = self.doc_ids[postings[0]]
+        for posting in postings[1:]:
+            docs = np.intersect1d(docs, self.doc_ids[posting], assume_unique=True)
+        if len(phrase) == 1:
+            return docs
+
+        matches = []
+        for doc in docs:
+            starts = None
+            for offset, posting in enumerate(postings):
+                p = posting.start + np.searchsorted(self.doc_ids[posting], doc)
+                positions = self.positions[self.pos_ptr[p]:self.pos_ptr[p + 1]] - offset
+                starts = positions if starts is None else starts[np.isin(starts, positions, assume_unique=True)]
+                if not len(starts):
+                    break
+            if len(starts):
+                matches.append(doc)
+        return np.array(matches, dtype=np.int32)
+
+    def scores(self, terms):
+        """Return the BM25 score of every document for a list of query terms"""
+        scores = np.zeros(len(self), dtype=np.float64)
+        for term in dict.fromkeys(terms):
+            posting = self._postings(term)
+            if posting is None:
+                continue
+            docs = self.doc_ids[posting]
+            freqs = self.term_freqs[posting]
+            idf = math.log(1 + (len(self) - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * freqs * (BM25_K1 + 1) / (freqs + self.doc_norms[docs])
+        return scores
+
+    @timed('search')
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Return (total, hits): the number of matching documents and the best limit of them as SearchHits
+
+        Loose words match any document containing one of them; every quoted
+        phrase must occur in a document as written. All words count towards
+        the BM25 score.
+        """
+        phrases, words = parse_query(query)
+        terms = words + [term for phrase in phrases for term in phrase]
+        if not terms:
+            return 0, []
+
+        scores = self.scores(terms)
+        if phrases:
+            candidates = self._phrase_docs(phrases[0])
+            for phrase in phrases[1:]:
+                candidates = np.intersect1d(candidates, self._phrase_docs(phrase), assume_unique=True)
+        else:
+            candidates = np.flatnonzero(scores > 0)
+
+        # Highest score first, earlier documents first among equal scores
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))][:limit]
+        matched = set(terms)
+        return len(candidates), [self._hit(doc, scores[doc], matched) for doc in ranked]
+
+    def _hit(self, doc, score, matched):
+        kind = DOCUMENT_KINDS[self.doc_kinds[doc]]
+        item = int(self.doc_items[doc])
+        text = self.headings[item] if kind == 'heading' else self.corpus.strings(kind + 's')[item]
+        spans = [(start, end) for term, start, end in tokenize(text) if term in matched]
+
+        heading = self.headings[self.doc_headings[doc]] if self.doc_headings[doc] >= 0 else None
+        page = self.doc_pages[doc]
+        url = self.urls[page] if page >= 0 else self.urls[0]
+        if url and heading:
+            # Text fragment link: browsers scroll to the heading and highlight it ('-' and ',' are syntax there)
+            url = f"{url.split('#', 1)[0]}#:~:text={quote(heading, safe='').replace('-', '%2D')}"
+        return SearchHit(kind, item, float(score), text, heading, url, spans)
+
+
+# Function to cut the part around the first hit out of a text
+def highlight(text, spans, width=SNIPPET_WIDTH):
+    """Return the snippet of text around its first span as (fragment, is_hit) pairs, with ellipses where it was cut"""
+    start = 0
+    if spans and len(text) > width:
+        start = max(0, min(spans[0][0] - width // 4, len(text) - width))
+        # Start and end on a word boundary
+        if start:
+            start = text.find(' ', start) + 1 or start
+    end = min(len(text), start + width)
+    if end < len(text):
+        boundary = text.rfind(' ', start, end)
+        end = boundary if boundary > start else end
+
+    parts = [('…', False)] if start else []
+    position = start
+    for span_start, span_end in spans:
+        if span_end <= start or span_start >= end:
+            continue
+        span_start, span_end = max(span_start, position), min(span_end, end)
+        if span_start > position:
+            parts.append((text[position:span_start], False))
+        parts.append((text[span_start:span_end], True))
+        position = span_end
+    if position < end:
+        parts.append((text[position:end], False))
+    if end < len(text):
+        parts.append(('…', False))
+    return parts
+
+
+# Function to build the search index of a snapshot
+@timed()
+def build_search_index(corpus, headings, pages=None, url=None):
+    """Return the SearchIndex of a snapshot's corpus and headings (pages: the provenance of a crawl)"""
+    return SearchIndex(corpus, headings, pages, url)
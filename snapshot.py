@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from snapshot_format import LazySnapshotData, decode_snapshot, encode_snapshot
+
+# Location of the cached scrape on disk; a name not ending in .json is written in the binary format
+SNAPSHOT_PATH = os.environ.get('SNAPSHOT_PATH', os.path.join('data', 'scraped_data.json'))
+
+
+# Helper function to turn decoded JSON into a read-only structure
+def freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+# Helper function to convert a frozen structure back into plain JSON types
+def thaw(value):
+    """Recursively convert read-only (or lazily decoded) mappings and tuples back to dicts and lists"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+# Helper function to replace a file without readers ever seeing a partial write
+def atomic_write(path, text):
+    """Write text (or bytes) to a temporary file in the same directory and rename it over path"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        if isinstance(text, bytes):
+            with os.fdopen(fd, 'wb') as f:
+                f.write(text)
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+        # mkstemp creates the file private to its owner; use the usual permissions
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Function to serialize snapshot data for the file at path
+def snapshot_bytes(data, path=SNAPSHOT_PATH):
+    """Return data as indented JSON for a .json path and in the binary snapshot format otherwise"""
+    if path.endswith('.json'):
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return encode_snapshot(data)
+
+
+# Function to read a snapshot file in either format into plain dicts and lists
+def read_snapshot_file(path=SNAPSHOT_PATH):
+    """Return the fully decoded data of a snapshot file"""
+    with open(path, 'rb') as f:
+        return dict(decode_snapshot(f.read()))
+
+
+class Snapshot:
+    """Immutable view of one scraped snapshot, versioned by a hash of its content"""
+
+    __slots__ = ('data', 'version', 'mtime_ns', 'size')
+
+    def __init__(self, data, version, mtime_ns=None, size=None):
+        object.__setattr__(self, 'data', freeze(data))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'mtime_ns', mtime_ns)
+        object.__setattr__(self, 'size', size)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __repr__(self):
+        return f"Snapshot(version={self.version!r})"
+
+    @classmethod
+    def from_bytes(cls, raw, mtime_ns=None):
+        """Decode a snapshot from the raw bytes of the file; binary snapshots decode each field on first use"""
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        return cls(decode_snapshot(raw, freeze), version, mtime_ns, len(raw))
+
+    @classmethod
+    def from_data(cls, data):
+        """Wrap in-memory data (e.g. the offline sample) in a snapshot"""
+        raw = json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        return cls(data, hashlib.sha256(raw).hexdigest()[:16])
+
+    def without(self, names):
+        """Return the same snapshot without some top-level fields of its data"""
+        data = {key: value for key, value in self.data.items() if key not in names}
+        return Snapshot(data, self.version, self.mtime_ns, self.size)
+
+
+class SnapshotStore:
+    """Process-wide holder of the current snapshot that reloads it when the file changes"""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self._current = None
+        self._lock = threading.Lock()
+
+    def _is_current(self, snapshot, stat):
+        return (
+            snapshot is not None
+            and snapshot.mtime_ns == stat.st_mtime_ns
+            and snapshot.size == stat.st_size
+        )
+
+    def get(self):
+        """Return the current snapshot, or None if no snapshot file exists yet"""
+        current = self._current
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return current
+
+        # Unchanged file: a single stat() call is all a request costs
+        if self._is_current(current, stat):
+            return current
+
+        with self._lock:
+            # Another thread may have reloaded the file while we waited
+            current = self._current
+            if self._is_current(current, stat):
+                return current
+
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            snapshot = Snapshot.from_bytes(raw, stat.st_mtime_ns)
+
+            # Keep the existing object when only the mtime changed
+            if current is not None and current.version == snapshot.version:
+                snapshot = Snapshot(current.data, current.version, stat.st_mtime_ns, len(raw))
+
+            # Swapping the reference is atomic, so readers see either the old or new snapshot
+            self._current = snapshot
+            print(f"Loaded snapshot {snapshot.version}")
+            return snapshot
+
+    def drop_fields(self, snapshot, names):
+        """Replace the current snapshot by a copy without some fields, if it is still current
+
+        Binary snapshots decode a field only on first use, so they are left as they are.
+        """
+        with self._lock:
+            if self._current is snapshot and not isinstance(snapshot.data, LazySnapshotData):
+                self._current = snapshot.without(names)
+
+    def clear(self):
+        """Drop the in-memory snapshot so the next get() reads the file again"""
+        with self._lock:
+            self._current = None
+
+
+# Default store shared by every request in this process
+snapshots = SnapshotStore()
+
+
+def get_snapshot():
+    """Return the current snapshot from the process-wide store"""
+    return snapshots.get()
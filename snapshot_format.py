@@ -0,0 +1,143 @@
+import json
+import struct
+import threading
+import zlib
+from collections.abc import Mapping
+
+# First bytes of a binary snapshot; JSON snapshots start with '{'
+MAGIC = b'VJNSNAP\x01'
+
+# Length of the JSON header that follows the magic bytes
+HEADER_LENGTH = struct.Struct('<I')
+
+# Section compression schemes
+COMPRESSIONS = ('zlib', 'none')
+
+
+# Function to tell a binary snapshot from a JSON one
+def is_binary_snapshot(raw):
+    """Return True if raw starts with the binary snapshot magic bytes"""
+    return bytes(raw[:len(MAGIC)]) == MAGIC
+
+
+# Function to encode snapshot data in the binary format
+def encode_snapshot(data, compression='zlib'):
+    """Return data as a binary snapshot with one independently decodable section per top-level field
+
+    Layout: MAGIC, a little-endian uint32 header length, a JSON header and the
+    section payloads. The header lists every section as [offset, length,
+    encoding] relative to the end of the header; string fields (such as
+    full_text) are stored as UTF-8 text, everything else as compact JSON.
+    Every payload is compressed on its own, so reading one section never
+    touches the others.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown snapshot compression {compression!r}")
+
+    sections = {}
+    payloads = []
+    offset = 0
+    for name, value in data.items():
+        if isinstance(value, str):
+            encoding, payload = 'text', value.encode('utf-8')
+        else:
+            encoding, payload = 'json', json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if compression == 'zlib':
+            payload = zlib.compress(payload, 6)
+        sections[name] = [offset, len(payload), encoding]
+        payloads.append(payload)
+        offset += len(payload)
+
+    header = json.dumps({'format': 1, 'compression': compression, 'sections': sections}, ensure_ascii=False).encode('utf-8')
+    return b''.join([MAGIC, HEADER_LENGTH.pack(len(header)), header] + payloads)
+
+
+class LazySnapshotData(Mapping):
+    """Read-only mapping over a binary snapshot that decodes each field on first access
+
+    Only the header is parsed up front; a field such as full_text is
+    decompressed and decoded when something reads it, and then kept. Values
+    pass through the optional freeze function (e.g. to make them read-only).
+    """
+
+    def __init__(self, raw, freeze=None):
+        raw = memoryview(raw)
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(raw, len(MAGIC))
+        header = json.loads(bytes(raw[start:start + header_length]).decode('utf-8'))
+        if header.get('format') != 1 or header.get('compression') not in COMPRESSIONS:
+            raise ValueError("Unsupported binary snapshot")
+
+        self._raw = raw
+        self._body = start + header_length
+        self._compression = header['compression']
+        self._sections = header['sections']
+        self._freeze = freeze or (lambda value: value)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _decode(self, name):
+        offset, length, encoding = self._sections[name]
+        payload = self._raw[self._body + offset:self._body + offset + length]
+        payload = zlib.decompress(payload) if self._compression == 'zlib' else bytes(payload)
+        if encoding == 'text':
+            return payload.decode('utf-8')
+        return json.loads(payload.decode('utf-8'))
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if name not in self._sections:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._values:
+                self._values[name] = self._freeze(self._decode(name))
+            return self._values[name]
+
+    def peek(self, name):
+        """Decode a field without keeping it (e.g. to copy it elsewhere)"""
+        if name in self._values:
+            return self._values[name]
+        return self._decode(name)
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+    def decoded(self):
+        """Return the names of the fields decoded so far"""
+        return list(self._values)
+
+
+# Function to decode either snapshot format
+def decode_snapshot(raw, freeze=None):
+    """Return the data of a binary snapshot (decoded lazily) or of a JSON snapshot (decoded at once)"""
+    if is_binary_snapshot(raw):
+        return LazySnapshotData(raw, freeze)
+    data = json.loads(bytes(raw).decode('utf-8'))
+    return freeze(data) if freeze else data
+
+
+# Convert a JSON snapshot to the binary format (or back) from the command line
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a snapshot between the JSON and the binary format")
+    parser.add_argument('source', help="snapshot to read (either format)")
+    parser.add_argument('target', help="file to write; a .json name writes JSON, anything else the binary format")
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='zlib')
+    args = parser.parse_args()
+
+    with open(args.source, 'rb') as f:
+        data = dict(decode_snapshot(f.read()))
+    if args.target.endswith('.json'):
+        output = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    else:
+        output = encode_snapshot(data, args.compression)
+    with open(args.target, 'wb') as f:
+        f.write(output)
+    print(f"Wrote {len(output)} bytes to {args.target}")
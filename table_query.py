@@ -0,0 +1,129 @@
+import math
+from collections import namedtuple
+
+import pandas as pd
+
+from amounts import parse_amount
+
+# Rows per page of the server-side DataTables
+PAGE_SIZE = 10
+
+# Operators of the DataTable filter_query syntax, as (name, spellings); longer spellings are tried first
+FILTER_OPERATORS = [
+    ('>=', ('ge ', '>=')),
+    ('<=', ('le ', '<=')),
+    ('<', ('lt ', '<')),
+    ('>', ('gt ', '>')),
+    ('!=', ('ne ', '!=')),
+    ('=', ('eq ', '=')),
+    ('contains', ('contains ',)),
+    ('datestartswith', ('datestartswith ',))
+]
+
+# Rows of a table as served to a DataTable: the cell values by column id, and the
+# parsed amounts of the numeric columns (used to filter and sort them by value)
+TableFrame = namedtuple('TableFrame', ['values', 'amounts'])
+
+
+# Function to split a filter_query into its conditions
+def parse_filter(filter_query):
+    """Return (column id, operator, value) for every '&&'-separated condition
+
+    Quoted values are text; unquoted values are numbers where possible.
+    Conditions that cannot be parsed are skipped.
+    """
+    conditions = []
+    for part in (filter_query or '').split(' && '):
+        for operator, spellings in FILTER_OPERATORS:
+            spelling = next((spelling for spelling in spellings if spelling in part), None)
+            if spelling is None:
+                continue
+            name_part, value_part = part.split(spelling, 1)
+            column_id = name_part[name_part.find('{') + 1:name_part.rfind('}')]
+            value_part = value_part.strip()
+            if len(value_part) > 1 and value_part[0] == value_part[-1] and value_part[0] in ('"', "'", '`'):
+                value = value_part[1:-1].replace('\\' + value_part[0], value_part[0])
+            else:
+                try:
+                    value = float(value_part)
+                except ValueError:
+                    value = value_part
+            conditions.append((column_id, operator, value))
+            break
+    return conditions
+
+
+# Helper function to compare a series with a value
+def _compare(series, operator, value):
+    if operator == '>=':
+        return series >= value
+    if operator == '<=':
+        return series <= value
+    if operator == '<':
+        return series < value
+    if operator == '>':
+        return series > value
+    if operator == '!=':
+        return series != value
+    return series == value
+
+
+# Function to find the rows matching a filter_query
+def filter_mask(frame, filter_query):
+    """Return a boolean Series selecting the rows of frame that match every condition"""
+    mask = pd.Series(True, index=frame.values.index)
+    for column_id, operator, value in parse_filter(filter_query):
+        if column_id not in frame.values.columns:
+            continue
+        text = frame.values[column_id].astype(str)
+        if operator in ('contains', 'datestartswith'):
+            if operator == 'contains':
+                mask &= text.str.contains(str(value), case=False, regex=False)
+            else:
+                mask &= text.str.startswith(str(value))
+        elif column_id in frame.amounts.columns:
+            # Numeric columns compare by amount, so "> 5 mln" works as well as "> 5000000"
+            if not isinstance(value, float):
+                amount = parse_amount(str(value))
+                if amount is None:
+                    continue
+                value = amount.value
+            mask &= _compare(frame.amounts[column_id], operator, value).fillna(False)
+        else:
+            mask &= _compare(text, operator, str(value))
+    return mask
+
+
+# Function to sort the selected rows of a frame
+def sort_index(frame, mask, sort_by):
+    """Return the index of the selected rows in the order of sort_by (a DataTable sort_by list)"""
+    index = frame.values.index[mask.to_numpy()]
+    sort_by = [item for item in (sort_by or []) if item.get('column_id') in frame.values.columns]
+    if not sort_by:
+        return index
+
+    keys = pd.DataFrame(index=index)
+    for i, item in enumerate(sort_by):
+        column_id = item['column_id']
+        if column_id in frame.amounts.columns:
+            keys[i] = frame.amounts.loc[index, column_id]
+        else:
+            keys[i] = frame.values.loc[index, column_id].astype(str).str.lower()
+    keys = keys.sort_values(
+        by=list(range(len(sort_by))),
+        ascending=[item.get('direction') != 'desc' for item in sort_by],
+        kind='mergesort',
+        na_position='last'
+    )
+    return keys.index
+
+
+# Function to answer a DataTable page request
+def query_page(frame, page_current=0, page_size=PAGE_SIZE, sort_by=None, filter_query=''):
+    """Return (records of the requested page, page count) after filtering and sorting"""
+    index = sort_index(frame, filter_mask(frame, filter_query), sort_by)
+    page_size = page_size or PAGE_SIZE
+    page_count = max(1, math.ceil(len(index) / page_size))
+    start = (page_current or 0) * page_size
+    rows = frame.values.loc[index[start:start + page_size]]
+    return rows.to_dict('records'), page_count
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from amounts import parse_amounts
+
+# Share of the rows that must hold an amount for a column to count as numeric
+NUMERIC_SHARE = 0.3
+
+# Upper bounds for rowspan and colspan, as in the HTML specification
+MAX_ROWSPAN = 65534
+MAX_COLSPAN = 1000
+
+
+# Helper function to read a rowspan or colspan attribute
+def parse_span(value, limit):
+    """Return the span as an int between 1 and limit; missing, zero or invalid values count as 1"""
+    try:
+        span = int(str(value).strip())
+    except (TypeError, ValueError):
+        return 1
+    return min(max(span, 1), limit)
+
+
+# Function to turn table rows with rowspan/colspan into a rectangular grid
+def resolve_spans(layout):
+    """Resolve spanning cells into a grid of (text, is_header) rows
+
+    layout is a list of rows, each a list of (text, rowspan, colspan, is_header)
+    cells. A spanning cell is repeated in every position it covers; positions no
+    cell covers are filled with empty text cells.
+    """
+    grid = []
+    # Cells covering rows below their own: column -> [rows left, cell]
+    pending = {}
+
+    def take_pending(row, column):
+        row.append(pending[column][1])
+        pending[column][0] -= 1
+        if not pending[column][0]:
+            del pending[column]
+
+    for cells in layout:
+        row = []
+        cells = iter(cells)
+        while True:
+            if len(row) in pending:
+                take_pending(row, len(row))
+                continue
+            cell = next(cells, None)
+            if cell is None:
+                break
+            text, rowspan, colspan, is_header = cell
+            for _ in range(colspan):
+                if rowspan > 1:
+                    pending[len(row)] = [rowspan - 1, (text, is_header)]
+                row.append((text, is_header))
+
+        # Cells spanning down into columns to the right of the last cell of this row
+        for column in sorted(pending):
+            if column >= len(row):
+                row.extend([('', False)] * (column - len(row)))
+                take_pending(row, column)
+
+        if row:
+            grid.append(row)
+
+    width = max((len(row) for row in grid), default=0)
+    return [row + [('', False)] * (width - len(row)) for row in grid]
+
+
+# Function to split a resolved grid into column names and body rows
+def grid_table(layout):
+    """Return (names, rows) for a table layout; leading rows of header cells become the column names"""
+    grid = resolve_spans(layout)
+    header_rows = 0
+    while header_rows < len(grid) and all(is_header for _, is_header in grid[header_rows]):
+        header_rows += 1
+
+    names = []
+    for column in range(len(grid[0]) if grid else 0):
+        # Stacked header rows (e.g. a year above "Lasten" and "Baten") are joined, repeats skipped
+        parts = []
+        for row in grid[:header_rows]:
+            text = row[column][0]
+            if text and text not in parts:
+                parts.append(text)
+        names.append(' '.join(parts) or f"Column {column+1}")
+
+    rows = [[text for text, _ in row] for row in grid[header_rows:]]
+    return names, rows
+
+
+# Function to rebuild the grid of a table that was stored without column data
+def legacy_table(table):
+    """Return (names, rows) from the headers and rows of an older snapshot, padded or truncated to the header count"""
+    if table['headers']:
+        names = list(table['headers'])
+    else:
+        names = [f"Column {i+1}" for i in range(max((len(row) for row in table['rows']), default=0))]
+    rows = [(list(row) + [''] * (len(names) - len(row)))[:len(names)] for row in table['rows']]
+    return names, rows
+
+
+# Function to type the columns of many tables with one amount parse
+def type_tables(tables):
+    """Convert (names, rows) tables into lists of typed column dicts
+
+    Every column holds its cell texts under values, and the parsed amount (or
+    None) and unit of every cell under amounts and units. A column is numeric
+    when more than NUMERIC_SHARE of its rows hold an amount.
+    """
+    cells = [cell for _, rows in tables for row in rows for cell in row]
+    parsed = parse_amounts(pd.Series(cells, dtype=object))
+    values = parsed['value'].to_numpy()
+    units = parsed['unit'].to_numpy()
+
+    typed = []
+    offset = 0
+    for names, rows in tables:
+        size = len(rows) * len(names)
+        shape = (len(rows), len(names))
+        table_values = values[offset:offset + size].reshape(shape)
+        table_units = units[offset:offset + size].reshape(shape)
+        offset += size
+
+        numeric = (~np.isnan(table_values)).sum(axis=0) > len(rows) * NUMERIC_SHARE
+        columns = []
+        for i, name in enumerate(names):
+            column_values = table_values[:, i]
+            columns.append({
+                'name': name,
+                'type': 'numeric' if numeric[i] else 'text',
+                'values': [row[i] for row in rows],
+                'amounts': [None if np.isnan(value) else float(value) for value in column_values],
+                'units': table_units[:, i].tolist()
+            })
+        typed.append(columns)
+    return typed
+
+
+# Function to get the typed columns of every table in a snapshot
+def table_columns(tables):
+    """Return the typed columns of each table, typing tables from older snapshots on the fly"""
+    columns = [table.get('columns') for table in tables]
+    missing = [i for i, table_columns in enumerate(columns) if table_columns is None]
+    if missing:
+        for i, typed in zip(missing, type_tables([legacy_table(tables[i]) for i in missing])):
+            columns[i] = typed
+    return columns
@@ -0,0 +1,177 @@
+import bisect
+import functools
+import json
+import re
+import threading
+import time
+
+# Upper bounds (seconds) of the timing histogram buckets
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds (bytes) of the payload histogram buckets
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# A pattern-matching component id in a callback output, e.g. {"index":"table-3","type":"data-table"}
+PATTERN_ID = re.compile(r'\{[^{}]*\}')
+
+
+# Helper function to escape a label value for the text format
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+# Helper function to format label names and values as {name="value",...}
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+# Function to turn a callback output into a label with a bounded number of values
+def output_label(output):
+    """Return output with every pattern-matching id replaced by its type, so all tables or nodes share one series"""
+    def collapse(match):
+        try:
+            return str(json.loads(match.group()).get('type', 'pattern'))
+        except (ValueError, AttributeError):
+            return 'pattern'
+    return PATTERN_ID.sub(collapse, output)
+
+
+# Helper function to format a sample value
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CallbackCounter:
+    """Counter whose values are read from a function when the metrics are scraped
+
+    The function returns {label values: count}; nothing is recorded on the
+    hot path, so counters that already exist elsewhere cost nothing extra.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames, read):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.read = read
+
+    def samples(self):
+        """Yield the sample lines of the counter"""
+        for labels, value in sorted(self.read().items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+
+
+class Histogram:
+    """Histogram with fixed buckets and optional labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Label values -> [count per bucket (the last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record one observation for the given label values"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        """Yield the cumulative bucket, sum and count lines of the histogram"""
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = format_labels(self.labelnames, labels, [('le', format_value(float(bound)))])
+                yield f"{self.name}_bucket{le} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        """Add a metric and return it"""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return the text exposition of every metric"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# Default registry of this process and the metrics shared by the modules
+registry = Registry()
+STAGE_SECONDS = registry.register(Histogram(
+    'voorjaarsnota_stage_seconds', "Time spent in each stage of scraping, processing and building the dashboard", ('stage',)
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    'voorjaarsnota_callback_seconds', "Time to answer a Dash callback request, by output", ('output',)
+))
+PAYLOAD_BYTES = registry.register(Histogram(
+    'voorjaarsnota_payload_bytes', "Size of Dash callback responses, by output", ('output',), SIZE_BUCKETS
+))
+ARTIFACT_BYTES = registry.register(Histogram(
+    'voorjaarsnota_artifact_bytes', "Size of serialized cache artifacts, by artifact", ('artifact',), SIZE_BUCKETS
+))
+
+
+class span:
+    """Time a stage into STAGE_SECONDS, as a context manager (with span('parse'): ...)"""
+
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+# Function to time every call of a function as a stage
+def timed(stage=None):
+    """Decorator recording the duration of each call in STAGE_SECONDS, labelled with stage (default: the function name)"""
+    def decorator(function):
+        name = stage or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorator
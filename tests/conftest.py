@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The modules live at the top of the repository, next to dashboard.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubServer:
+    """Local HTTP server answering from a dict of path -> (status, headers, body)
+
+    A route may also be a function of the request handler returning such a
+    tuple, e.g. to answer 304 when If-None-Match matches. Every request is
+    recorded as (path, headers).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append((self.path, dict(self.headers)))
+                route = stub.routes.get(self.path, (404, {}, 'Not found'))
+                status, headers, body = route(self) if callable(route) else route
+                body = body.encode('utf-8')
+                self.send_response(status)
+                headers = {'Content-Type': 'text/html; charset=utf-8', **headers}
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def page(self, title, body):
+        """Return the HTML of a small page"""
+        return f"<html><head><title>{title}</title></head><body>{body}</body></html>"
+
+
+@pytest.fixture
+def stub_server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
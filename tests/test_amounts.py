@@ -0,0 +1,30 @@
+import math
+
+import pandas as pd
+
+from amounts import parse_amount, parse_amounts
+
+
+def test_parse_amount_dutch_notation():
+    assert parse_amount("€ 1.250,5 miljoen").value == 1250500000
+    assert parse_amount("- € 5.382").value == -5382
+    assert parse_amount("45 mln").unit == 'miljoen'
+
+
+def test_parse_amounts_matches_parse_amount():
+    cells = ["€ 1.250,5 miljoen", "- € 5.382", "45 mln", "geen bedrag"]
+    parsed = parse_amounts(pd.Series(cells, dtype=object))
+    for cell, (value, unit) in zip(cells, parsed[['value', 'unit']].itertuples(index=False)):
+        amount = parse_amount(cell)
+        if amount is None:
+            assert math.isnan(value) and unit is None
+        else:
+            assert value == amount.value and unit == amount.unit
+
+
+def test_parse_amounts_without_any_amount():
+    parsed = parse_amounts(pd.Series(['abc', '', None], index=[3, 4, 5]))
+    assert list(parsed.index) == [3, 4, 5]
+    assert parsed['value'].isna().all()
+    assert parsed['unit'].isna().all()
+    assert (parsed['multiplier'] == 1.0).all()
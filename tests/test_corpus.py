@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import corpus
+from corpus import Corpus, corpus_path, encode_corpus, open_corpus
+from snapshot import Snapshot, SnapshotStore
+
+DATA = {
+    'full_text': "Kop\nEerste alinea over zorg.\nTweede alinea.",
+    'paragraphs': ["Eerste alinea over zorg.", "Tweede alinea."],
+    'list_items': ["Één punt"]
+}
+
+
+@pytest.fixture(autouse=True)
+def no_open_corpora():
+    corpus._corpora.clear()
+    yield
+    corpus._corpora.clear()
+
+
+# Helper function to write a snapshot file and read it back as the dashboard does
+def write_snapshot(path, data, mtime):
+    raw = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(raw)
+    os.utime(path, (mtime, mtime))
+    return Snapshot.from_bytes(raw, os.stat(path).st_mtime_ns)
+
+
+def test_corpus_round_trip():
+    mapped = Corpus.from_data(DATA)
+    assert list(mapped.strings('paragraphs')) == DATA['paragraphs']
+    assert list(mapped.strings('list_items')) == DATA['list_items']
+    assert ''.join(mapped.chunks('full_text', size=4)) == DATA['full_text']
+    offset = mapped.find_all("Tweede", 'paragraphs')[0]
+    assert mapped.string_index('paragraphs', offset) == 1
+
+
+def test_truncated_corpus_file_falls_back_to_memory(tmp_path):
+    snapshot_path = str(tmp_path / 'scraped_data.json')
+    directory = str(tmp_path / 'cache')
+    snapshot = write_snapshot(snapshot_path, DATA, 1000)
+    os.makedirs(directory)
+    with open(corpus_path(snapshot.version, snapshot_path, directory), 'wb') as f:
+        f.write(encode_corpus(DATA)[:100])
+
+    with pytest.raises(ValueError):
+        Corpus.open(corpus_path(snapshot.version, snapshot_path, directory))
+    opened = open_corpus(snapshot, snapshot_path, directory)
+    assert list(opened.strings('paragraphs')) == DATA['paragraphs']
+
+
+def test_old_snapshot_never_removes_the_newer_corpus(tmp_path):
+    snapshot_path = str(tmp_path / 'scraped_data.json')
+    directory = str(tmp_path / 'cache')
+    old = write_snapshot(snapshot_path, DATA, 1000)
+    open_corpus(old, snapshot_path, directory)
+    os.utime(corpus_path(old.version, snapshot_path, directory), (1000, 1000))
+
+    # The refresher replaces the snapshot; the first worker on it removes the old corpus
+    new = write_snapshot(snapshot_path, dict(DATA, paragraphs=["Nieuwe alinea."]), 2000)
+    corpus._corpora.clear()
+    open_corpus(new, snapshot_path, directory)
+    assert not os.path.exists(corpus_path(old.version, snapshot_path, directory))
+
+    # A worker still on the old snapshot writes its corpus again but leaves the new one alone
+    corpus._corpora.clear()
+    open_corpus(old, snapshot_path, directory)
+    assert os.path.exists(corpus_path(new.version, snapshot_path, directory))
+    assert os.path.exists(corpus_path(old.version, snapshot_path, directory))
+    assert sorted(os.listdir(tmp_path)) == ['cache', 'scraped_data.json']
+
+
+def test_json_snapshot_drops_its_text_once_the_corpus_is_open(tmp_path, monkeypatch):
+    snapshot_path = str(tmp_path / 'scraped_data.json')
+    directory = str(tmp_path / 'cache')
+    write_snapshot(snapshot_path, dict(DATA, headings=[]), 1000)
+    store = SnapshotStore(snapshot_path)
+    monkeypatch.setattr(corpus, 'snapshots', store)
+
+    snapshot = store.get()
+    opened = open_corpus(snapshot, snapshot_path, directory)
+    current = store.get()
+    assert current.version == snapshot.version
+    assert 'headings' in current.data
+    assert not any(name in current.data for name in corpus.CORPUS_FIELDS)
+    assert list(opened.strings('paragraphs')) == DATA['paragraphs']
+    assert open_corpus(current, snapshot_path, directory) is opened
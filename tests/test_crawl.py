@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import scraper
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_crawl_root_defaults(monkeypatch):
+    monkeypatch.setattr(scraper, 'CRAWL_ROOT', None)
+    assert scraper.crawl_root('https://example.org/voorjaarsnota2024/hoofdlijnen/01-voortgang/') == 'https://example.org/voorjaarsnota2024/'
+    assert scraper.crawl_root('http://127.0.0.1:8765/') == 'http://127.0.0.1:8765/'
+    assert scraper.crawl_root('http://127.0.0.1:8765/nota/index.html') == 'http://127.0.0.1:8765/nota/'
+    monkeypatch.setattr(scraper, 'CRAWL_ROOT', 'http://127.0.0.1:8765/nota/')
+    assert scraper.crawl_root('http://127.0.0.1:8765/') == 'http://127.0.0.1:8765/nota/'
+
+
+def test_import_with_local_scrape_url():
+    env = dict(os.environ, SCRAPE_URL='http://127.0.0.1:8765/', SCRAPE_TTL='999999999')
+    env.pop('CRAWL_ROOT', None)
+    result = subprocess.run([sys.executable, '-c', 'import scraper, dashboard'], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_crawl_skips_a_page_that_fails_to_parse(stub_server, monkeypatch):
+    stub_server.routes['/'] = (200, {}, stub_server.page("Start", '<p>Begin</p><a href="good.html">a</a><a href="bad.html">b</a>'))
+    stub_server.routes['/good.html'] = (200, {}, stub_server.page("Goed", '<p>Goede pagina</p>'))
+    stub_server.routes['/bad.html'] = (200, {}, stub_server.page("Fout", '<p>Kapotte pagina</p>'))
+
+    parse_page = scraper.parse_page
+
+    def failing_parse_page(html, links=None):
+        if 'Kapotte' in html:
+            raise AttributeError("broken page")
+        return parse_page(html, links)
+
+    monkeypatch.setattr(scraper, 'parse_page', failing_parse_page)
+    data = scraper.crawl_site(stub_server.url, workers=2)
+    assert [page['url'] for page in data['pages']] == [stub_server.url, stub_server.url + 'good.html']
+    assert data['paragraphs'] == ['Begin', 'Goede pagina']
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from scraper import Refresher, read_meta
+from snapshot import read_snapshot_file
+
+
+def make_refresher(stub_server, tmp_path, ttl=0):
+    return Refresher(
+        url=stub_server.url,
+        path=str(tmp_path / 'scraped_data.json'),
+        meta_path=str(tmp_path / 'scraped_data.meta.json'),
+        lock_path=str(tmp_path / 'scraped_data.lock'),
+        ttl=ttl,
+        mode='page'
+    )
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_refresh_with_etag_revalidates_with_304(stub_server, tmp_path):
+    def route(handler):
+        if handler.headers.get('If-None-Match') == '"v1"':
+            return 304, {'ETag': '"v1"'}, ''
+        return 200, {'ETag': '"v1"'}, stub_server.page("Nota", '<p>Eerste versie</p>')
+
+    stub_server.routes['/'] = route
+    refresher = make_refresher(stub_server, tmp_path)
+    assert refresher.refresh() is True
+    assert read_snapshot_file(refresher.path)['paragraphs'] == ['Eerste versie']
+    snapshot = read_bytes(refresher.path)
+    checked_at = read_meta(refresher.meta_path)['checked_at']
+
+    time.sleep(0.01)
+    assert refresher.refresh() is False
+    assert stub_server.requests[-1][1].get('If-None-Match') == '"v1"'
+    assert read_bytes(refresher.path) == snapshot
+    assert read_meta(refresher.meta_path)['checked_at'] != checked_at
+
+
+def test_refresh_without_validators_keeps_unchanged_content(stub_server, tmp_path):
+    stub_server.routes['/'] = (200, {}, stub_server.page("Nota", '<p>Zelfde inhoud</p>'))
+    refresher = make_refresher(stub_server, tmp_path)
+    assert refresher.refresh() is True
+    snapshot = read_bytes(refresher.path)
+
+    # A new last_updated alone must not produce a new snapshot (and version)
+    assert refresher.refresh() is False
+    assert read_bytes(refresher.path) == snapshot
+
+    stub_server.routes['/'] = (200, {}, stub_server.page("Nota", '<p>Nieuwe inhoud</p>'))
+    assert refresher.refresh() is True
+    assert read_snapshot_file(refresher.path)['paragraphs'] == ['Nieuwe inhoud']
+
+
+def test_stale_snapshot_is_served_while_revalidating(stub_server, tmp_path):
+    stub_server.routes['/'] = (200, {}, stub_server.page("Nota", '<p>Oud</p>'))
+    refresher = make_refresher(stub_server, tmp_path, ttl=3600)
+    refresher.refresh()
+    assert not refresher.is_stale()
+
+    refresher.ttl = 0
+    release = threading.Event()
+
+    def slow_route(handler):
+        release.wait(10)
+        return 200, {}, stub_server.page("Nota", '<p>Nieuw</p>')
+
+    stub_server.routes['/'] = slow_route
+    assert refresher.is_stale()
+    assert refresher.refresh_in_background() is True
+    # A second request while the first is running does not start another refresh
+    assert refresher.refresh_in_background() is False
+    assert read_snapshot_file(refresher.path)['paragraphs'] == ['Oud']
+
+    release.set()
+    deadline = time.time() + 10
+    while read_snapshot_file(refresher.path)['paragraphs'] != ['Nieuw'] and time.time() < deadline:
+        time.sleep(0.05)
+    assert read_snapshot_file(refresher.path)['paragraphs'] == ['Nieuw']
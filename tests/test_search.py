@@ -0,0 +1,79 @@
+import pytest
+
+from corpus import Corpus
+from search import build_search_index, highlight, normalize, parse_query
+
+HEADINGS = [{'level': 1, 'text': "Zorg"}, {'level': 2, 'text': "Financiën"}]
+PARAGRAPHS = [
+    "De jeugdzorg kost meer.",
+    "Financiële tegenvallers in de begroting en de algemene reserve.",
+    "De reserve algemene middelen."
+]
+LIST_ITEMS = ["Tegenvallers, tegenvallers en nog eens tegenvallers."]
+DATA = {
+    'full_text': '\n'.join(["Zorg", PARAGRAPHS[0], "Financiën", PARAGRAPHS[1], PARAGRAPHS[2], LIST_ITEMS[0]]),
+    'paragraphs': PARAGRAPHS,
+    'list_items': LIST_ITEMS
+}
+
+
+@pytest.fixture(scope='module')
+def index():
+    return build_search_index(Corpus.from_data(DATA), HEADINGS, url='https://example.org/nota/')
+
+
+@pytest.mark.parametrize('inflected, base', [
+    ("bedragen", "bedrag"),
+    ("financiële", "financieel"),
+    ("jaren", "jaar"),
+    ("plannen", "plan"),
+    ("gemeenten", "gemeente"),
+    ("miljoenen", "miljoen"),
+    ("mogelijkheden", "mogelijkheid"),
+    ("programma's", "programma")
+])
+def test_normalize_meets_inflections(inflected, base):
+    assert normalize(inflected) == normalize(base)
+
+
+def test_normalize_keeps_short_words_and_numbers():
+    assert normalize("De") == "de"
+    assert normalize("2024") == "2024"
+
+
+def test_parse_query_phrases_and_words():
+    assert parse_query('zorg "algemene reserve"') == ([[normalize("algemene"), normalize("reserve")]], ["zorg"])
+
+
+def test_phrase_matches_words_in_order(index):
+    total, hits = index.search('"algemene reserve"')
+    assert total == 1 and hits[0].text == PARAGRAPHS[1]
+    total, hits = index.search('"reserve algemene"')
+    assert total == 1 and hits[0].text == PARAGRAPHS[2]
+
+
+def test_bm25_ranks_more_occurrences_first(index):
+    total, hits = index.search("tegenvaller")
+    assert total == 2
+    assert [hit.kind for hit in hits] == ['list_item', 'paragraph']
+    assert hits[0].score > hits[1].score
+
+
+def test_hits_link_to_their_heading(index):
+    _, hits = index.search("jeugdzorg")
+    assert hits[0].heading == "Zorg"
+    _, hits = index.search('"algemene reserve"')
+    assert hits[0].heading == "Financiën"
+    assert hits[0].url == 'https://example.org/nota/#:~:text=Financi%C3%ABn'
+
+
+def test_highlight_marks_matched_words(index):
+    _, hits = index.search("tegenvallers")
+    parts = highlight(hits[0].text, hits[0].spans)
+    assert ''.join(text for text, _ in parts) == LIST_ITEMS[0]
+    assert [text for text, is_hit in parts if is_hit] == ["Tegenvallers", "tegenvallers", "tegenvallers"]
+
+
+def test_empty_and_unknown_queries(index):
+    assert index.search("") == (0, [])
+    assert index.search("onbekendwoord") == (0, [])
@@ -0,0 +1,21 @@
+from scraper import parse_page
+from tables import type_tables
+
+
+def test_type_tables_numeric_and_text_columns():
+    names = ['Programma', 'Bedrag']
+    rows = [['Wonen', '€ 5 mln'], ['Zorg', '- € 1.250'], ['Cultuur', '']]
+    (columns,) = type_tables([(names, rows)])
+    assert [column['type'] for column in columns] == ['text', 'numeric']
+    assert columns[1]['amounts'] == [5000000.0, -1250.0, None]
+    assert columns[0]['amounts'] == [None, None, None]
+
+
+def test_parse_page_with_text_only_table():
+    data = parse_page('<html><body><table><tr><th>Naam</th></tr><tr><td>Wonen</td></tr></table><p>abc</p></body></html>')
+    (table,) = data['tables']
+    assert table['headers'] == ['Naam']
+    assert table['rows'] == [['Wonen']]
+    assert table['columns'][0]['type'] == 'text'
+    assert table['columns'][0]['amounts'] == [None]
+    assert data['paragraphs'] == ['abc']
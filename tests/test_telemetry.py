@@ -0,0 +1,18 @@
+from telemetry import Histogram, output_label
+
+
+def test_output_label_collapses_pattern_matching_ids():
+    concrete = '..{"index":"table-3","type":"data-table"}.data...{"index":"table-3","type":"data-table"}.page_count..'
+    wildcard = '..{"index":["MATCH"],"type":"data-table"}.data...{"index":["MATCH"],"type":"data-table"}.page_count..'
+    assert output_label(concrete) == output_label(wildcard) == '..data-table.data...data-table.page_count..'
+    assert output_label('topics-chart.figure') == 'topics-chart.figure'
+
+
+def test_histogram_samples():
+    histogram = Histogram('test_seconds', "Test", ('output',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, 'a')
+    histogram.observe(0.5, 'a')
+    samples = list(histogram.samples())
+    assert 'test_seconds_bucket{output="a",le="0.1"} 1' in samples
+    assert 'test_seconds_bucket{output="a",le="+Inf"} 2' in samples
+    assert 'test_seconds_count{output="a"} 2' in samples
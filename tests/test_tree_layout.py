@@ -0,0 +1,20 @@
+from cache import artifacts
+from tree_layout import layouts, tidy_tree_layout, tree_positions
+
+
+def test_tidy_tree_layout_centres_parents():
+    positions = tidy_tree_layout('root', {'a': 'root', 'b': 'root', 'a1': 'a', 'a2': 'a'})
+    assert positions['a1'] == (0, -2) and positions['a2'] == (1, -2)
+    assert positions['a'] == (0.5, -1)
+    assert positions['root'] == ((0.5 + 2) / 2, 0)
+
+
+def test_expand_sets_do_not_evict_shared_artifacts():
+    artifacts.set('version', 'section', {'kept': True})
+    # One structure per expand set, as a client clicking through the mindmap produces
+    for count in range(layouts.max_entries + 10):
+        parents = {f"node-{i}": 'root' for i in range(count + 1)}
+        tree_positions('root', parents, 'radial')
+    assert artifacts.get('version', 'section') == {'kept': True}
+    assert not any(name.startswith('layout-') for _, name in artifacts._entries)
+    assert len(layouts._entries) == layouts.max_entries
@@ -0,0 +1,105 @@
+import heapq
+import re
+
+# Words of four or more letters, including letters with diacritics such as "financiële" or "coördinatie"
+WORD_PATTERN = re.compile(r'(?<!\w)[^\W\d_]{4,}(?!\w)')
+
+# A single word character
+WORD_CHAR = re.compile(r'\w')
+
+# Common Dutch stopwords to filter out (only words of four or more letters can match)
+STOPWORDS = frozenset([
+    'de', 'het', 'een', 'en', 'van', 'in', 'op', 'voor', 'vóór', 'met', 'door', 'aan',
+    'is', 'zijn', 'worden', 'werd'
+])
+
+# Maximum number of distinct words the counter keeps
+TOPIC_CAPACITY = 10000
+
+# Characters of text tokenized at a time
+CHUNK_SIZE = 64 * 1024
+
+
+# Function to split a long text into chunks for the tokenizer
+def text_chunks(text, size=CHUNK_SIZE):
+    """Yield consecutive slices of text of at most size characters"""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+# Function to stream the lowercased topic words of a text
+def iter_words(chunks, stopwords=STOPWORDS):
+    """Yield the words of a stream of text chunks as one list per chunk, skipping stopwords
+
+    Chunks may be cut anywhere (including inside a word), so the stream can
+    come from text_chunks(), file reads or the pages of several documents.
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk.lower()
+        # Hold back a word that may continue in the next chunk
+        cut = len(text)
+        while cut and WORD_CHAR.match(text, cut - 1):
+            cut -= 1
+        carry = text[cut:]
+        yield [word for word in WORD_PATTERN.findall(text, 0, cut) if word not in stopwords]
+    yield [word for word in WORD_PATTERN.findall(carry) if word not in stopwords]
+
+
+class TopKCounter:
+    """Heavy-hitters counter (Space-Saving) that keeps at most capacity words
+
+    While fewer than capacity distinct words have been seen the counts are
+    exact. After that a new word replaces the word with the smallest count
+    and inherits that count, so a count is off by at most the total number of
+    words divided by the capacity, and frequent words are never lost.
+    """
+
+    def __init__(self, capacity=TOPIC_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        # Min-heap with one (count, word) entry per counted word; entries may lag behind the counts
+        self._heap = []
+
+    def add(self, word):
+        """Count one occurrence of word"""
+        counts = self.counts
+        if word in counts:
+            counts[word] += 1
+            return
+        if len(counts) < self.capacity:
+            counts[word] = 1
+            heapq.heappush(self._heap, (1, word))
+            return
+
+        # Find the word with the smallest count, refreshing outdated heap entries on the way
+        heap = self._heap
+        while heap[0][0] != counts[heap[0][1]]:
+            heapq.heapreplace(heap, (counts[heap[0][1]], heap[0][1]))
+        count, evicted = heap[0]
+        del counts[evicted]
+        counts[word] = count + 1
+        heapq.heapreplace(heap, (count + 1, word))
+
+    def update(self, words):
+        """Count every word of an iterable"""
+        counts = self.counts
+        add = self.add
+        for word in words:
+            if word in counts:
+                counts[word] += 1
+            else:
+                add(word)
+
+    def most_common(self, n):
+        """Return the n most frequent (word, count) pairs, ties in order of first count"""
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+
+# Function to find the most frequent topics of a corpus in one pass
+def top_topics(chunks, n=10, capacity=TOPIC_CAPACITY):
+    """Return the n most frequent non-stopword words of a stream of text chunks"""
+    counter = TopKCounter(capacity)
+    for words in iter_words(chunks):
+        counter.update(words)
+    return counter.most_common(n)
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import math
+import os
+
+import networkx as nx
+
+from cache import FrameCache
+
+# Layout engine for the mindmap: 'radial' (default), 'tree' or 'spring'
+MINDMAP_LAYOUT = os.environ.get('MINDMAP_LAYOUT', 'radial')
+
+# Number of layouts kept; every expand set a client sends has its own structure
+MINDMAP_LAYOUT_CACHE_SIZE = int(os.environ.get('MINDMAP_LAYOUT_CACHE_SIZE', '32'))
+
+# Layouts by structure, in this process only, so clicking through the mindmap never evicts shared artifacts
+layouts = FrameCache(max_entries=MINDMAP_LAYOUT_CACHE_SIZE)
+
+
+# Helper function to list the children of every node in heading order
+def tree_children(root, parents):
+    children = {root: []}
+    for node, parent in parents.items():
+        children.setdefault(parent, []).append(node)
+        children.setdefault(node, [])
+    return children
+
+
+# Function to hash the structure of a heading tree
+def structure_key(root, parents):
+    """Return a short hash of the root and the (node, parent) pairs in order"""
+    raw = json.dumps([root, list(parents.items())], ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+# Function to lay out a tree with leaves side by side and parents centred above their children
+def tidy_tree_layout(root, parents):
+    """Return {node: (x, y)} with x in leaf slots and y = -depth, in linear time
+
+    Leaves get consecutive slots from left to right in heading order; every
+    parent sits halfway between its first and last child.
+    """
+    children = tree_children(root, parents)
+    depth = {root: 0}
+    slot = {}
+    leaves = 0
+
+    # Iterative post-order walk, so deep trees do not hit the recursion limit
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        kids = children[node]
+        if visited:
+            if kids:
+                slot[node] = (slot[kids[0]] + slot[kids[-1]]) / 2
+            else:
+                slot[node] = leaves
+                leaves += 1
+            continue
+        stack.append((node, True))
+        for kid in reversed(kids):
+            depth[kid] = depth[node] + 1
+            stack.append((kid, False))
+
+    return {node: (slot[node], -depth[node]) for node in slot}
+
+
+# Function to lay out a tree in rings around the root
+def radial_layout(root, parents):
+    """Return {node: (x, y)} with the depth as radius and the tidy-tree slot as angle"""
+    leaves = sum(1 for kids in tree_children(root, parents).values() if not kids)
+    positions = {}
+    for node, (slot, y) in tidy_tree_layout(root, parents).items():
+        angle = 2 * math.pi * slot / max(leaves, 1)
+        radius = -y
+        positions[node] = (radius * math.cos(angle), radius * math.sin(angle))
+    return positions
+
+
+# Function to lay out a tree with the force-directed spring layout used before
+def spring_layout(root, parents):
+    """Return {node: (x, y)} from networkx's spring layout with a fixed seed"""
+    G = nx.Graph()
+    G.add_node(root)
+    for node, parent in parents.items():
+        G.add_node(node)
+        G.add_edge(parent, node)
+    return nx.spring_layout(G, k=1.0, iterations=100, seed=42)
+
+
+# Layout engines by name
+LAYOUT_ENGINES = {
+    'radial': radial_layout,
+    'tree': tidy_tree_layout,
+    'spring': spring_layout
+}
+
+
+# Function to get (cached) positions for a heading tree
+def tree_positions(root, parents, layout=MINDMAP_LAYOUT):
+    """Return {node: [x, y]}, computed once per heading structure and layout engine (do not modify it)"""
+    if layout not in LAYOUT_ENGINES:
+        layout = 'radial'
+    engine = LAYOUT_ENGINES[layout]
+    return layouts.get_or_build(
+        structure_key(root, parents),
+        f"layout-{layout}",
+        lambda: {node: [float(x), float(y)] for node, (x, y) in engine(root, parents).items()}
+    )